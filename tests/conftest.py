@@ -1,5 +1,7 @@
 import os
 
+import pytest
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 root_dir_content = os.listdir(BASE_DIR)
 PROJECT_DIR_NAME = 'yatube'
@@ -37,3 +39,15 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_shared_state(tmp_path_factory):
+    """Как core.test_runner.IsolatedStateRunner: своя SHARED_STATE_PATH
+    и синхронный core.jobs, чтобы тесты не писали в рабочий файл."""
+    from django.test.utils import override_settings
+
+    state_path = tmp_path_factory.mktemp('shared_state') / 'state.sqlite3'
+    with override_settings(SHARED_STATE_PATH=str(state_path),
+                           JOBS_EAGER=True):
+        yield
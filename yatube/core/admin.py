@@ -0,0 +1,24 @@
+from django.contrib import admin
+
+from .models import RequestProfile
+
+
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        'created',
+        'view_name',
+        'path',
+        'duration_ms',
+        'samples',
+        'user',
+        'file_name',
+    )
+    list_filter = ('view_name',)
+    search_fields = ('path',)
+    readonly_fields = list_display
+
+    def has_add_permission(self, request):
+        return False
+
+
+admin.site.register(RequestProfile, RequestProfileAdmin)
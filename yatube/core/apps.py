@@ -1,5 +1,27 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import jobs, metrics
+        from .auth import user_changed, user_logged
+        from .db import apply_sqlite_pragmas
+        connection_created.connect(
+            apply_sqlite_pragmas, dispatch_uid='core_sqlite_pragmas')
+
+        user_model = get_user_model()
+        post_save.connect(user_changed, sender=user_model,
+                          dispatch_uid='core_auth_user_saved')
+        post_delete.connect(user_changed, sender=user_model,
+                            dispatch_uid='core_auth_user_deleted')
+        user_logged_in.connect(user_logged, dispatch_uid='core_auth_login')
+        user_logged_out.connect(user_logged, dispatch_uid='core_auth_logout')
+
+        metrics.register_gauge(
+            'yatube_jobs_queued', 'Задачи в очереди core.jobs', jobs.queued)
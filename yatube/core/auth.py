@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.crypto import constant_time_compare
+
+USER_CACHE_KEY: str = 'auth_user:{}'
+USER_CACHE_TIMEOUT: int = 15 * 60
+
+
+def _snapshot(user):
+    fields = user._meta.concrete_fields
+    return (
+        tuple(field.attname for field in fields),
+        tuple(getattr(user, field.attname) for field in fields),
+    )
+
+
+def _from_snapshot(snapshot):
+    field_names, values = snapshot
+    return auth.get_user_model().from_db(
+        DEFAULT_DB_ALIAS, field_names, values)
+
+
+def get_user(request):
+    """Как django.contrib.auth.get_user, но строка User берётся из кеша.
+
+    Сессия хранится в cached_db, а она и снимок пользователя — в общем
+    для воркеров кеше 'shared', поэтому для тёплого пользователя запрос
+    к базе не нужен вовсе, а выход, смена пароля и деактивация сразу
+    действуют во всех воркерах."""
+    session = request.session
+    try:
+        user_id = auth.get_user_model()._meta.pk.to_python(
+            session[auth.SESSION_KEY])
+        backend_path = session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+
+    cache = caches['shared']
+    snapshot = cache.get(USER_CACHE_KEY.format(user_id))
+    if snapshot is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(USER_CACHE_KEY.format(user.pk), _snapshot(user),
+                      USER_CACHE_TIMEOUT)
+        return user
+
+    user = _from_snapshot(snapshot)
+    if not user.is_active:
+        return AnonymousUser()
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(
+            session_hash, user.get_session_auth_hash())):
+        session.flush()
+        return AnonymousUser()
+    user.backend = backend_path
+    return user
+
+
+def invalidate_user(user_id):
+    caches['shared'].delete(USER_CACHE_KEY.format(user_id))
+
+
+def user_changed(sender, instance, **kwargs):
+    """Сбрасывает снимок при смене пароля, правке профиля и удалении."""
+    invalidate_user(instance.pk)
+
+
+def user_logged(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
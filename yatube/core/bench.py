@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.servers.basehttp import get_internal_wsgi_application
+from django.middleware.csrf import get_token
+from django.test import Client, RequestFactory
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_samples, pct):
+    """Перцентиль по методу ближайшего ранга для отсортированной выборки."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1,
+                      round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def summarize(samples, elapsed):
+    """Сводка по задержкам в секундах: пропускная способность
+    и перцентили в миллисекундах."""
+    ordered = sorted(samples)
+    summary = {
+        'count': len(ordered),
+        'throughput': round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3)
+        if ordered else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f'p{pct}_ms'] = round(percentile(ordered, pct) * 1000, 3)
+    return summary
+
+
+class WsgiClient(RequestFactory):
+    """Отправляет запросы в WSGI_APPLICATION целиком, как сервер: с
+    обёрткой статики и прогревом из yatube/wsgi.py.
+
+    Вместо ответа возвращает код статуса; тело дочитывается, чтобы
+    в замер попала и потоковая отдача. Сессия берётся из force_login,
+    а CSRF-токен подставляется в cookie и заголовок, как это делает
+    браузер."""
+
+    def __init__(self, user=None, **defaults):
+        super().__init__(**defaults)
+        self.application = get_internal_wsgi_application()
+        if user is not None:
+            login = Client()
+            login.force_login(user)
+            self.cookies = login.cookies
+        request = RequestFactory().get('/')
+        self.defaults['HTTP_X_CSRFTOKEN'] = get_token(request)
+        self.cookies[settings.CSRF_COOKIE_NAME] = request.META['CSRF_COOKIE']
+
+    def request(self, **request):
+        statuses = []
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(status)
+
+        body = self.application(self._base_environ(**request),
+                                start_response)
+        try:
+            for _ in body:
+                pass
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        return int(statuses[0].split()[0])
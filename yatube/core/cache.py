@@ -0,0 +1,155 @@
+import pickle
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from core import shared_store, timing
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache_entry ('
+    'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)',
+    'CREATE INDEX IF NOT EXISTS cache_entry_expires '
+    'ON cache_entry (expires)',
+)
+
+_MISSING = object()
+
+
+class InstrumentedLocMemCache(LocMemCache):
+    """LocMemCache, считающий попадания и промахи для Server-Timing."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            timing.incr('cache_miss')
+            return default
+        timing.incr('cache_hit')
+        return value
+
+
+class SharedStoreCache(BaseCache):
+    """Кеш в общей для всех воркеров SQLite-базе core.shared_store.
+
+    Медленнее LocMemCache, но запись, удаление и очистка видны всем
+    процессам сразу, поэтому здесь хранится то, что нельзя показывать
+    устаревшим: сессии, снимки пользователей, счётчики непрочитанного.
+    Просроченные записи удаляются при чтении и не чаще раза в
+    CULL_INTERVAL секунд при записи."""
+
+    CULL_INTERVAL: int = 60
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._culled = 0.0
+
+    def _store(self):
+        return shared_store.ensure_schema('cache', SCHEMA)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _cull(self, conn, now):
+        if now - self._culled >= self.CULL_INTERVAL:
+            self._culled = now
+            conn.execute('DELETE FROM cache_entry WHERE expires <= ?', (now,))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        conn = self._store()
+        with conn:
+            cursor = conn.execute(
+                'INSERT INTO cache_entry (key, value, expires) '
+                'VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE '
+                'SET value = excluded.value, expires = excluded.expires '
+                'WHERE expires <= ?',
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                 self.get_backend_timeout(timeout), now))
+        return cursor.rowcount == 1
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        row = self._store().execute(
+            'SELECT value FROM cache_entry '
+            'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, time.time())).fetchone()
+        if row is None:
+            timing.incr('cache_miss')
+            return default
+        timing.incr('cache_hit')
+        return pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        """Читает все ключи одним запросом."""
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        rows = self._store().execute(
+            'SELECT key, value FROM cache_entry '
+            'WHERE key IN ({}) AND (expires IS NULL OR expires > ?)'.format(
+                ', '.join('?' * len(keys))),
+            (*keys, time.time())).fetchall()
+        timing.incr('cache_hit', len(rows))
+        timing.incr('cache_miss', len(keys) - len(rows))
+        return {keys[key]: pickle.loads(value) for key, value in rows}
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        """Записывает все ключи одним executemany."""
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        conn = self._store()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO cache_entry (key, value, expires) '
+                'VALUES (?, ?, ?)',
+                [(self._key(key, version),
+                  pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+                 for key, value in data.items()])
+            self._cull(conn, now)
+        return []
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        conn = self._store()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entry (key, value, expires) '
+                'VALUES (?, ?, ?)',
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                 self.get_backend_timeout(timeout)))
+            self._cull(conn, now)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        conn = self._store()
+        with conn:
+            cursor = conn.execute(
+                'UPDATE cache_entry SET expires = ? WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), key, time.time()))
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        conn = self._store()
+        with conn:
+            conn.execute('DELETE FROM cache_entry WHERE key = ?', (key,))
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        conn = self._store()
+        with conn:
+            conn.executemany('DELETE FROM cache_entry WHERE key = ?',
+                             [(key,) for key in keys])
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version) is not _MISSING
+
+    def clear(self):
+        conn = self._store()
+        with conn:
+            conn.execute('DELETE FROM cache_entry')
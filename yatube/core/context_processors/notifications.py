@@ -0,0 +1,17 @@
+from django.utils.functional import SimpleLazyObject
+
+from posts import notifications
+
+
+def unread_notifications(request):
+    """Добавляет число непрочитанных уведомлений пользователя.
+
+    Значение считается лениво и берётся из кеша, поэтому страницы без
+    шапки и повторные показы не обращаются к базе."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        'unread_notifications': SimpleLazyObject(
+            lambda: notifications.unread_count(user)),
+    }
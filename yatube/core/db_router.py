@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Как часто перепроверять, не создан ли файл реплики, в секундах.
+REPLICA_RECHECK_INTERVAL: int = 5
+
+_state = threading.local()
+_replica = {'alias': None, 'checked': None}
+
+
+def _find_replica():
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    if alias not in settings.DATABASES:
+        return None
+    primary_name = connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+    if connections[alias].settings_dict['NAME'] == primary_name:
+        return None
+    if not os.path.exists(settings.REPLICA_DATABASE_PATH):
+        return None
+    return alias
+
+
+def replica_alias():
+    """Алиас реплики или None, если реплика не настроена, ещё не создана
+    sync_replica или указывает на ту же базу (тестовое зеркало).
+
+    Найденная реплика запоминается до конца жизни процесса, а её
+    отсутствие перепроверяется не чаще раза в REPLICA_RECHECK_INTERVAL,
+    чтобы воркер, запущенный до первой sync_replica, начал ею
+    пользоваться."""
+    if _replica['alias'] is not None:
+        return _replica['alias']
+    now = time.monotonic()
+    checked = _replica['checked']
+    if checked is None or now - checked >= REPLICA_RECHECK_INTERVAL:
+        _replica['alias'] = _find_replica()
+        _replica['checked'] = now
+    return _replica['alias']
+
+
+def set_replica_reads(enabled):
+    _state.use_replica = enabled
+
+
+def replica_reads_enabled():
+    return getattr(_state, 'use_replica', False)
+
+
+class PrimaryReplicaRouter:
+    """Отправляет чтения моделей из REPLICA_APPS на реплику, пока
+    это разрешено для текущего запроса; все записи идут в основную базу."""
+
+    def db_for_read(self, model, **hints):
+        if (replica_reads_enabled()
+                and model._meta.app_label in settings.REPLICA_APPS):
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == getattr(settings, 'REPLICA_DATABASE', None):
+            return False
+        return None
@@ -0,0 +1,20 @@
+from django.conf import settings
+
+
+def client_ip(request):
+    """Адрес клиента с учётом доверенного обратного прокси.
+
+    Если запрос пришёл с адреса из TRUSTED_PROXIES, адресом клиента
+    считается самый правый адрес X-Forwarded-For, который не
+    принадлежит доверенному прокси: левые части заголовка может
+    подделать сам клиент. Без заголовка это запрос самого прокси или
+    локального сервиса, и возвращается REMOTE_ADDR."""
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    if remote_addr not in settings.TRUSTED_PROXIES:
+        return remote_addr
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    for address in reversed(forwarded.split(',')):
+        address = address.strip()
+        if address and address not in settings.TRUSTED_PROXIES:
+            return address
+    return remote_addr
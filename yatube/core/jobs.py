@@ -0,0 +1,59 @@
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue()
+_lock = threading.Lock()
+_worker_pid = None
+
+
+def _work():
+    while True:
+        func, args = _queue.get()
+        try:
+            func(*args)
+        except Exception:
+            logger.exception('Задача %s завершилась ошибкой', func.__name__)
+        finally:
+            close_old_connections()
+            _queue.task_done()
+
+
+def _ensure_worker():
+    """Запускает фоновый поток один раз на процесс, в том числе после
+    fork воркера."""
+    global _worker_pid
+    with _lock:
+        if _worker_pid != os.getpid():
+            threading.Thread(target=_work, name='core-jobs',
+                             daemon=True).start()
+            _worker_pid = os.getpid()
+
+
+def enqueue(func, *args):
+    """Выполняет func(*args) в фоновом потоке после фиксации текущей
+    транзакции.
+
+    Очередь живёт в памяти процесса: задачи, не успевшие выполниться до
+    его остановки, теряются. С JOBS_EAGER задача выполняется сразу —
+    так работают тесты."""
+    if settings.JOBS_EAGER:
+        func(*args)
+        return
+    _ensure_worker()
+    transaction.on_commit(lambda: _queue.put((func, args)))
+
+
+def queued():
+    return _queue.qsize()
+
+
+def wait():
+    """Ждёт выполнения всех поставленных задач."""
+    _queue.join()
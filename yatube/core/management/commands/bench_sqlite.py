@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.bench import summarize
+
+SEED_BATCH: int = 1000
+
+
+def _connect(path, pragmas):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+    return connection
+
+
+def _seed(path, rows, pragmas):
+    connection = _connect(path, pragmas)
+    connection.execute(
+        'CREATE TABLE post ('
+        'id INTEGER PRIMARY KEY, author_id INTEGER, text TEXT, '
+        'pub_date REAL)')
+    connection.execute('CREATE INDEX post_pub_date ON post (pub_date)')
+    for start in range(0, rows, SEED_BATCH):
+        connection.executemany(
+            'INSERT INTO post (author_id, text, pub_date) VALUES (?, ?, ?)',
+            [(i % 100, 'текст поста ' * 20, time.time())
+             for i in range(start, min(rows, start + SEED_BATCH))])
+    connection.commit()
+    connection.close()
+
+
+class Worker(threading.Thread):
+    def __init__(self, path, pragmas, persistent, deadline, write):
+        super().__init__(daemon=True)
+        self.path = path
+        self.pragmas = pragmas
+        self.persistent = persistent
+        self.deadline = deadline
+        self.write = write
+        self.latencies = []
+        self.errors = 0
+
+    def _operation(self, connection, step):
+        if self.write:
+            connection.execute(
+                'INSERT INTO post (author_id, text, pub_date) '
+                'VALUES (?, ?, ?)',
+                (step % 100, 'новый пост', time.time()))
+            connection.commit()
+        else:
+            connection.execute(
+                'SELECT id, author_id, text FROM post '
+                'ORDER BY pub_date DESC LIMIT 10 OFFSET ?',
+                ((step % 50) * 10,)).fetchall()
+
+    def run(self):
+        connection = None
+        if self.persistent:
+            connection = _connect(self.path, self.pragmas)
+        step = 0
+        try:
+            while time.perf_counter() < self.deadline:
+                started = time.perf_counter()
+                if not self.persistent:
+                    connection = None
+                try:
+                    if connection is None:
+                        connection = _connect(self.path, self.pragmas)
+                    self._operation(connection, step)
+                    self.latencies.append(time.perf_counter() - started)
+                except sqlite3.OperationalError:
+                    # Ошибка может случиться и при открытии соединения,
+                    # тогда откатывать нечего.
+                    self.errors += 1
+                    if connection is not None:
+                        connection.rollback()
+                finally:
+                    if not self.persistent and connection is not None:
+                        connection.close()
+                step += 1
+        finally:
+            if self.persistent and connection is not None:
+                connection.close()
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает SQLite по умолчанию, только SQLITE_PRAGMAS, '
+            'только постоянные соединения и оба изменения вместе '
+            'со смешанной нагрузкой чтения и записи.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5.0,
+                            help='Длительность каждого прогона в секундах.')
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Сколько постов создать перед прогоном.')
+
+    def _run_profile(self, pragmas, persistent, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            _seed(path, options['rows'], pragmas)
+            started = time.perf_counter()
+            deadline = started + options['duration']
+            workers = [
+                Worker(path, pragmas, persistent, deadline, write=False)
+                for _ in range(options['readers'])
+            ] + [
+                Worker(path, pragmas, persistent, deadline, write=True)
+                for _ in range(options['writers'])
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+
+        result = {}
+        for kind, write in (('reads', False), ('writes', True)):
+            selected = [worker for worker in workers if worker.write is write]
+            result[kind] = summarize(
+                [latency for worker in selected
+                 for latency in worker.latencies],
+                elapsed)
+            result[kind]['locked_errors'] = sum(
+                worker.errors for worker in selected)
+        return result
+
+    def handle(self, *args, **options):
+        pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+        # Каждое изменение прогоняется и отдельно, чтобы было видно,
+        # какая часть ускорения от прагм, а какая от переиспользования
+        # соединений.
+        report = {
+            'default': self._run_profile({}, False, options),
+            'pragmas': self._run_profile(pragmas, False, options),
+            'persistent': self._run_profile({}, True, options),
+            'tuned': self._run_profile(pragmas, True, options),
+        }
+        self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
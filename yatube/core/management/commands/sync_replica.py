@@ -0,0 +1,39 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+PAGES_PER_STEP: int = 1024
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную SQLite-базу в файл реплики через online '
+            'backup API.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять синхронизацию каждые N секунд.')
+        parser.add_argument(
+            '--pages', type=int, default=PAGES_PER_STEP,
+            help='Сколько страниц копировать за шаг, не блокируя запись.')
+
+    def sync(self, pages):
+        started = time.perf_counter()
+        source = sqlite3.connect(settings.DATABASES[DEFAULT_DB_ALIAS]['NAME'])
+        target = sqlite3.connect(settings.REPLICA_DATABASE_PATH)
+        try:
+            source.backup(target, pages=pages)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(
+            f'Реплика обновлена за {time.perf_counter() - started:.2f} с')
+
+    def handle(self, *args, **options):
+        self.sync(options['pages'])
+        while options['interval']:
+            time.sleep(options['interval'])
+            self.sync(options['pages'])
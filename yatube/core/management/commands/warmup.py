@@ -0,0 +1,15 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core import warmup
+
+
+class Command(BaseCommand):
+    help = ('Выполняет прогрев воркера в текущем процессе и печатает '
+            'длительность шагов; отчёт также дописывается в '
+            'WARMUP_REPORT_PATH.')
+
+    def handle(self, *args, **options):
+        report = warmup.run()
+        self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
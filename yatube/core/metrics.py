@@ -0,0 +1,139 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+from core import shared_store
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS metric ('
+    'name TEXT NOT NULL, labels TEXT NOT NULL, le TEXT NOT NULL, '
+    'value REAL NOT NULL, PRIMARY KEY (name, labels, le))',
+)
+INF = '+Inf'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+UPLOAD_BUCKETS = (10 ** 4, 10 ** 5, 10 ** 6, 5 * 10 ** 6, 10 ** 7)
+
+HISTOGRAMS = {
+    'yatube_request_duration_seconds': (
+        'Время обработки запроса', LATENCY_BUCKETS),
+    'yatube_request_queries': (
+        'Количество SQL-запросов на запрос', QUERY_BUCKETS),
+    'yatube_upload_bytes': (
+        'Размер multipart-загрузок', UPLOAD_BUCKETS),
+}
+COUNTERS = {
+    'yatube_cache_hits_total': 'Попадания в кеш',
+    'yatube_cache_misses_total': 'Промахи кеша',
+}
+
+_lock = threading.Lock()
+_pending = {}
+_last_flush = time.monotonic()
+_gauges = {}
+
+
+def _labels(**labels):
+    return ','.join(
+        '{}="{}"'.format(
+            name, str(value).replace('\\', r'\\').replace('"', r'\"'))
+        for name, value in sorted(labels.items()))
+
+
+def _add(name, labels, le, value):
+    key = (name, labels, le)
+    _pending[key] = _pending.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """Добавляет наблюдение в гистограмму name."""
+    buckets = HISTOGRAMS[name][1]
+    index = bisect_left(buckets, value)
+    le = repr(buckets[index]) if index < len(buckets) else INF
+    label_string = _labels(**labels)
+    with _lock:
+        _add(name, label_string, le, 1)
+        _add(name, label_string, '', value)
+
+
+def incr(name, value=1, **labels):
+    if not value:
+        return
+    with _lock:
+        _add(name, _labels(**labels), '', value)
+
+
+def register_gauge(name, description, func):
+    """Регистрирует показатель, вычисляемый в момент сбора метрик."""
+    _gauges[name] = (description, func)
+
+
+def flush(force=False):
+    """Сбрасывает накопленные в процессе значения в общее хранилище
+    не чаще раза в METRICS_FLUSH_INTERVAL секунд."""
+    global _last_flush
+    now = time.monotonic()
+    if not force and now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+        return
+    with _lock:
+        rows = [key + (value,) for key, value in _pending.items()]
+        _pending.clear()
+        _last_flush = now
+    if not rows:
+        return
+    conn = shared_store.ensure_schema('metrics', SCHEMA)
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.executemany(
+            'INSERT INTO metric (name, labels, le, value) '
+            'VALUES (?, ?, ?, ?) ON CONFLICT (name, labels, le) '
+            'DO UPDATE SET value = value + excluded.value',
+            rows)
+
+
+def _format_value(value):
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _histogram_lines(name, rows):
+    by_labels = {}
+    for labels, le, value in rows:
+        by_labels.setdefault(labels, {})[le] = value
+    buckets = [repr(bucket) for bucket in HISTOGRAMS[name][1]] + [INF]
+    for labels, values in sorted(by_labels.items()):
+        prefix = f'{labels},' if labels else ''
+        cumulative = 0
+        for le in buckets:
+            cumulative += values.get(le, 0)
+            yield (f'{name}_bucket{{{prefix}le="{le}"}} '
+                   f'{_format_value(cumulative)}')
+        suffix = f'{{{labels}}}' if labels else ''
+        yield f'{name}_sum{suffix} {_format_value(values.get("", 0))}'
+        yield f'{name}_count{suffix} {_format_value(cumulative)}'
+
+
+def exposition():
+    """Все метрики в текстовом формате Prometheus."""
+    flush(force=True)
+    conn = shared_store.ensure_schema('metrics', SCHEMA)
+    rows = {}
+    for name, labels, le, value in conn.execute(
+            'SELECT name, labels, le, value FROM metric ORDER BY name'):
+        rows.setdefault(name, []).append((labels, le, value))
+
+    lines = []
+    for name, (description, _) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+        lines += _histogram_lines(name, rows.get(name, ()))
+    for name, description in COUNTERS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+        for labels, _, value in rows.get(name, ()):
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{name}{suffix} {_format_value(value)}')
+    for name, (description, func) in sorted(_gauges.items()):
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} gauge',
+                  f'{name} {_format_value(func())}']
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,37 @@
+from django.conf import settings
+
+from core.db_router import set_replica_reads
+
+PIN_PRIMARY_SESSION_KEY: str = '_db_pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """Включает чтение с реплики для представлений из REPLICA_VIEWS.
+
+    После первой записи (небезопасный метод или представление из
+    REPLICA_PIN_VIEWS) сессия закрепляется за основной базой, чтобы
+    пользователь сразу видел свои изменения."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            set_replica_reads(False)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        session = getattr(request, 'session', None)
+        if (request.method not in SAFE_METHODS
+                or view_name in settings.REPLICA_PIN_VIEWS):
+            if session is not None:
+                session[PIN_PRIMARY_SESSION_KEY] = True
+            return None
+        pinned = session is not None and session.get(PIN_PRIMARY_SESSION_KEY)
+        if view_name in settings.REPLICA_VIEWS and not pinned:
+            set_replica_reads(True)
+        return None
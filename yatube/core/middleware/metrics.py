@@ -0,0 +1,38 @@
+from time import perf_counter
+
+from core import metrics, timing
+
+
+class MetricsMiddleware:
+    """Собирает гистограммы задержек и SQL по имени URL для /metrics.
+
+    Должен стоять после ServerTimingMiddleware, чтобы видеть счётчики
+    текущего запроса."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.observe('yatube_request_duration_seconds',
+                        perf_counter() - started, view=view)
+
+        timings = timing.current()
+        if timings is not None:
+            metrics.observe('yatube_request_queries',
+                            timings.counts['db'], view=view)
+            metrics.incr('yatube_cache_hits_total',
+                         timings.counts['cache_hit'])
+            metrics.incr('yatube_cache_misses_total',
+                         timings.counts['cache_miss'])
+
+        content_type = request.META.get('CONTENT_TYPE', '')
+        if content_type.startswith('multipart/form-data'):
+            metrics.observe('yatube_upload_bytes',
+                            int(request.META.get('CONTENT_LENGTH') or 0),
+                            view=view)
+        metrics.flush()
+        return response
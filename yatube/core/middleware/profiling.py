@@ -0,0 +1,56 @@
+from time import perf_counter
+
+from django.conf import settings
+
+from core import profiler
+from core.models import RequestProfile
+
+PROFILE_HEADER: str = 'HTTP_X_PROFILE'
+PROFILE_PARAM: str = '_profile'
+
+
+class StaffProfilerMiddleware:
+    """Профилирует запрос сотрудника с заголовком X-Profile или
+    параметром ?_profile и сохраняет collapsed stacks в
+    PROFILER_OUTPUT_DIR.
+
+    Должен стоять последним: он сам вызывает представление."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (PROFILE_HEADER not in request.META
+                and PROFILE_PARAM not in request.GET):
+            return None
+        if not request.user.is_staff:
+            return None
+        if not profiler.acquire_slot(request.user.pk):
+            return None
+
+        sampler = profiler.StackSampler(settings.PROFILER_SAMPLE_INTERVAL)
+        response = None
+        started = perf_counter()
+        try:
+            with sampler:
+                response = view_func(request, *view_args, **view_kwargs)
+                if callable(getattr(response, 'render', None)):
+                    response = response.render()
+        finally:
+            # Профиль упавшего представления нужен не меньше остальных;
+            # исключение после записи уходит дальше по цепочке.
+            duration = perf_counter() - started
+            view_name = request.resolver_match.view_name
+            record = RequestProfile.objects.create(
+                user=request.user,
+                view_name=view_name,
+                path=request.get_full_path()[:2000],
+                duration_ms=round(duration * 1000),
+                samples=sampler.samples,
+                file_name=profiler.write_profile(sampler, view_name),
+            )
+        response['X-Profile-Id'] = str(record.pk)
+        return response
@@ -0,0 +1,53 @@
+import math
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from core import ratelimit
+from core.http import client_ip
+
+# Как часто удалять простаивающие корзины, в секундах.
+PRUNE_INTERVAL: int = 60
+
+
+class RateLimitMiddleware:
+    """Ограничивает частоту запросов к представлениям из RATELIMITS.
+
+    Авторизованные пользователи расходуют свою корзину токенов, гости —
+    корзину своего IP с учётом доверенного прокси. Стоит перед
+    CsrfViewMiddleware, чтобы отказ 429 отдавался до разбора тела
+    запроса. Раз в PRUNE_INTERVAL удаляет корзины, которые за время
+    простоя успели бы пополниться полностью."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_idle = max(
+            (limit['burst'] / ratelimit.parse_rate(limit['rate'])
+             for limit in settings.RATELIMITS.values()), default=0)
+        self.pruned = time.monotonic()
+
+    def __call__(self, request):
+        now = time.monotonic()
+        if now - self.pruned >= PRUNE_INTERVAL:
+            self.pruned = now
+            ratelimit.prune(self.max_idle)
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        limit = settings.RATELIMITS.get(view_name)
+        if limit is None or request.method not in limit['methods']:
+            return None
+        if request.user.is_authenticated:
+            key = f'{view_name}:user:{request.user.pk}'
+        else:
+            key = f'{view_name}:ip:{client_ip(request)}'
+        retry_after = ratelimit.take(
+            key, ratelimit.parse_rate(limit['rate']), limit['burst'])
+        if not retry_after:
+            return None
+        response = HttpResponse('Слишком много запросов.', status=429,
+                                content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = str(math.ceil(retry_after))
+        return response
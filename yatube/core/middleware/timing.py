@@ -0,0 +1,80 @@
+import json
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.db import connections
+
+from core import timing
+
+logger = logging.getLogger(__name__)
+
+
+def _record_query(execute, sql, params, many, context):
+    with timing.timer('db'):
+        return execute(sql, params, many, context)
+
+
+def _metric(name, seconds=None, description=None):
+    parts = [name]
+    if seconds is not None:
+        parts.append(f'dur={seconds * 1000:.1f}')
+    if description:
+        parts.append(f'desc="{description}"')
+    return ';'.join(parts)
+
+
+def server_timing_header(timings, total):
+    counts = timings.counts
+    durations = timings.durations
+    return ', '.join((
+        _metric('db', durations['db'], f'{counts["db"]} queries'),
+        _metric('tpl', durations['tpl']),
+        _metric('thumb', durations['thumb'], f'{counts["thumb"]} tags'),
+        _metric('cache', description=(
+            f'hit={counts["cache_hit"]} miss={counts["cache_miss"]}')),
+        _metric('total', total),
+    ))
+
+
+class ServerTimingMiddleware:
+    """Замеряет SQL, рендер шаблонов, кеш и thumbnail в каждом запросе.
+
+    Итог отдаётся заголовком Server-Timing и строкой JSON в лог
+    core.middleware.timing с именем представления."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = timing.start()
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(_record_query))
+                response = self.get_response(request)
+        finally:
+            timing.stop()
+        total = perf_counter() - started
+        response['Server-Timing'] = server_timing_header(timings, total)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(self.log_record(
+                request, response, timings, total)))
+        return response
+
+    def log_record(self, request, response, timings, total):
+        match = request.resolver_match
+        return {
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(timings.durations['db'] * 1000, 2),
+            'db_queries': timings.counts['db'],
+            'tpl_ms': round(timings.durations['tpl'] * 1000, 2),
+            'thumb_ms': round(timings.durations['thumb'] * 1000, 2),
+            'cache_hits': timings.counts['cache_hit'],
+            'cache_misses': timings.counts['cache_miss'],
+        }
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата')),
+                ('view_name', models.CharField(max_length=200, verbose_name='Представление')),
+                ('path', models.CharField(max_length=2000, verbose_name='Адрес')),
+                ('duration_ms', models.PositiveIntegerField(verbose_name='Длительность, мс')),
+                ('samples', models.PositiveIntegerField(verbose_name='Семплов')),
+                ('file_name', models.CharField(max_length=255, verbose_name='Файл')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request_profiles', to=settings.AUTH_USER_MODEL, verbose_name='Кто запросил')),
+            ],
+            options={
+                'verbose_name': 'Профиль запроса',
+                'verbose_name_plural': 'Профили запросов',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
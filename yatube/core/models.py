@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import models
+
+
+class RequestProfile(models.Model):
+    created = models.DateTimeField('Дата', auto_now_add=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name='Кто запросил',
+        related_name='request_profiles',
+    )
+    view_name = models.CharField('Представление', max_length=200)
+    path = models.CharField('Адрес', max_length=2000)
+    duration_ms = models.PositiveIntegerField('Длительность, мс')
+    samples = models.PositiveIntegerField('Семплов')
+    file_name = models.CharField('Файл', max_length=255)
+
+    class Meta:
+        ordering = ('-created',)
+        verbose_name = 'Профиль запроса'
+        verbose_name_plural = 'Профили запросов'
+
+    def __str__(self):
+        return f'{self.view_name} {self.created:%Y-%m-%d %H:%M:%S}'
@@ -0,0 +1,117 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+
+from core import shared_store
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS profiler_slot ('
+    'key TEXT PRIMARY KEY, expires REAL NOT NULL)',
+)
+USER_COOLDOWN_KEY: str = 'user:{}'
+GLOBAL_COOLDOWN_KEY: str = 'global'
+
+
+class StackSampler:
+    """Семплирующий профайлер одного потока.
+
+    Фоновый поток раз в interval секунд снимает стек целевого потока
+    и копит его в формате collapsed stacks (flamegraph.pl, speedscope)."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+            self._stop.wait(self.interval)
+
+    @staticmethod
+    def _collapse(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(
+                f'{code.co_name} ({os.path.basename(code.co_filename)}'
+                f':{code.co_firstlineno})')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def collapsed(self):
+        return ''.join(
+            f'{stack} {count}\n' for stack, count in self.stacks.items())
+
+
+def _store():
+    return shared_store.ensure_schema('profiler', SCHEMA)
+
+
+def acquire_slot(user_id):
+    """Не больше одного профиля на пользователя за PROFILER_USER_COOLDOWN
+    и одного на сайт за PROFILER_GLOBAL_COOLDOWN секунд.
+
+    Паузы хранятся в общем хранилище, чтобы ограничение действовало на
+    все воркеры, и занимаются обе сразу в одной транзакции: отказ по
+    одной паузе не расходует другую."""
+    now = time.time()
+    user_key = USER_COOLDOWN_KEY.format(user_id)
+    conn = _store()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute('DELETE FROM profiler_slot WHERE expires <= ?', (now,))
+        busy = conn.execute(
+            'SELECT 1 FROM profiler_slot WHERE key IN (?, ?)',
+            (user_key, GLOBAL_COOLDOWN_KEY)).fetchone()
+        if busy is None:
+            conn.executemany(
+                'INSERT INTO profiler_slot (key, expires) VALUES (?, ?)', [
+                    (user_key, now + settings.PROFILER_USER_COOLDOWN),
+                    (GLOBAL_COOLDOWN_KEY,
+                     now + settings.PROFILER_GLOBAL_COOLDOWN),
+                ])
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    return busy is None
+
+
+def reset_slots():
+    """Освобождает все паузы."""
+    _store().execute('DELETE FROM profiler_slot')
+
+
+def write_profile(sampler, view_name):
+    os.makedirs(settings.PROFILER_OUTPUT_DIR, exist_ok=True)
+    file_name = '{}-{}-{}.folded'.format(
+        timezone.now().strftime('%Y%m%d-%H%M%S'),
+        view_name.replace(':', '_'),
+        uuid.uuid4().hex[:8])
+    with open(os.path.join(settings.PROFILER_OUTPUT_DIR, file_name),
+              'w') as profile_file:
+        profile_file.write(sampler.collapsed())
+    return file_name
@@ -0,0 +1,64 @@
+import time
+
+from core import shared_store
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS ratelimit_bucket ('
+    'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)',
+)
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+# Пополнение и списание токена — один UPDATE, поэтому параллельные
+# воркеры не могут потратить один и тот же токен дважды.
+TAKE_SQL = (
+    'UPDATE ratelimit_bucket '
+    'SET tokens = MIN(:burst, tokens + (:now - updated) * :rate) - 1, '
+    'updated = :now '
+    'WHERE key = :key '
+    'AND MIN(:burst, tokens + (:now - updated) * :rate) >= 1'
+)
+
+
+def parse_rate(rate):
+    """Переводит строку вида '30/h' в токены в секунду."""
+    count, period = rate.split('/')
+    return int(count) / PERIODS[period]
+
+
+def take(key, rate, burst):
+    """Списывает токен из корзины key.
+
+    Возвращает 0, если токен списан, иначе — через сколько секунд
+    появится следующий."""
+    conn = shared_store.ensure_schema('ratelimit', SCHEMA)
+    now = time.time()
+    conn.execute(
+        'INSERT OR IGNORE INTO ratelimit_bucket (key, tokens, updated) '
+        'VALUES (?, ?, ?)', (key, burst, now))
+    cursor = conn.execute(
+        TAKE_SQL, {'key': key, 'rate': rate, 'burst': burst, 'now': now})
+    if cursor.rowcount:
+        return 0
+    tokens, updated = conn.execute(
+        'SELECT tokens, updated FROM ratelimit_bucket WHERE key = ?',
+        (key,)).fetchone()
+    available = min(burst, tokens + (now - updated) * rate)
+    return (1 - available) / rate
+
+
+def prune(max_idle):
+    """Удаляет корзины, не тронутые дольше max_idle секунд.
+
+    Если max_idle не меньше времени полного пополнения любой корзины,
+    удалённые корзины были полными, и удаление ничего не меняет:
+    take создаст их заново полными."""
+    conn = shared_store.ensure_schema('ratelimit', SCHEMA)
+    return conn.execute(
+        'DELETE FROM ratelimit_bucket WHERE updated <= ?',
+        (time.time() - max_idle,)).rowcount
+
+
+def reset():
+    """Очищает все корзины."""
+    shared_store.ensure_schema('ratelimit', SCHEMA).execute(
+        'DELETE FROM ratelimit_bucket')
@@ -0,0 +1,35 @@
+import os
+import sqlite3
+import threading
+
+from django.conf import settings
+
+_local = threading.local()
+
+
+def connection():
+    """Соединение с общей для всех воркеров SQLite-базой SHARED_STATE_PATH.
+
+    Соединение своё у каждого потока и переоткрывается после fork и при
+    смене пути в настройках."""
+    path = settings.SHARED_STATE_PATH
+    if (getattr(_local, 'path', None) != path
+            or getattr(_local, 'pid', None) != os.getpid()):
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        _local.connection = conn
+        _local.path = path
+        _local.pid = os.getpid()
+        _local.schemas = set()
+    return _local.connection
+
+
+def ensure_schema(name, statements):
+    """Выполняет DDL из statements один раз на соединение."""
+    conn = connection()
+    if name not in _local.schemas:
+        for statement in statements:
+            conn.execute(statement)
+        _local.schemas.add(name)
+    return conn
@@ -0,0 +1,54 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.json', '.xml', '.html',
+)
+# Сжатая копия сохраняется, только если она заметно меньше оригинала.
+MIN_COMPRESSION_RATIO: float = 0.95
+
+
+def _write_if_smaller(path, original_size, data):
+    if len(data) >= original_size * MIN_COMPRESSION_RATIO:
+        return False
+    with open(path, 'wb') as compressed_file:
+        compressed_file.write(data)
+    return True
+
+
+def compress_file(path):
+    """Кладёт рядом с файлом варианты .gz и, если установлен brotli, .br.
+
+    Возвращает список созданных путей."""
+    with open(path, 'rb') as source:
+        content = source.read()
+    created = []
+    if _write_if_smaller(path + '.gz', len(content),
+                         gzip.compress(content, compresslevel=9, mtime=0)):
+        created.append(path + '.gz')
+    if brotli is not None and _write_if_smaller(
+            path + '.br', len(content),
+            brotli.compress(content, quality=11)):
+        created.append(path + '.br')
+    return created
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хеширует имена файлов и заранее сжимает их при collectstatic."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        names = set(self.hashed_files.values()) | set(paths)
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                for created in compress_file(self.path(name)):
+                    yield name, os.path.relpath(created, self.location), True
@@ -0,0 +1,26 @@
+import os
+import shutil
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class IsolatedStateRunner(DiscoverRunner):
+    """Запускает тесты с отдельной SHARED_STATE_PATH, чтобы метрики и
+    корзины ограничения частоты не переживали прогон и не смешивались
+    с данными запущенного сервера, и с синхронным выполнением core.jobs:
+    TestCase не фиксирует транзакции, и on_commit не срабатывает."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.state_dir = tempfile.mkdtemp()
+        self.state_settings = override_settings(
+            SHARED_STATE_PATH=os.path.join(self.state_dir, 'state.sqlite3'),
+            JOBS_EAGER=True)
+        self.state_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.state_settings.disable()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,72 @@
+from django.contrib.sessions.backends.cached_db import KEY_PREFIX
+from django.core.cache import cache, caches
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import User
+
+from ..auth import USER_CACHE_KEY, _snapshot
+from ..cache import SharedStoreCache
+
+
+class CachedAuthenticationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user',
+                                            password='secret-1234')
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_warm_request_makes_no_auth_queries(self):
+        """Тёплый запрос авторизованного пользователя не ходит в базу
+        за сессией и пользователем (было 2 запроса, стало 0)"""
+        url = reverse('about:author')
+        self.authorized_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.authorized_client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_profile_edit_invalidates_snapshot(self):
+        url = reverse('about:author')
+        self.authorized_client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Новое имя'
+        user.save()
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.context['user'].first_name, 'Новое имя')
+
+    def test_password_change_logs_out_other_sessions(self):
+        url = reverse('about:author')
+        self.authorized_client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('another-5678')
+        user.save()
+        response = self.authorized_client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_logout_is_seen_by_other_workers(self):
+        """Выход на одном воркере виден кешу другого процесса: сессия
+        и снимок пользователя лежат в общем хранилище"""
+        self.authorized_client.get(reverse('about:author'))
+        session_key = KEY_PREFIX + self.authorized_client.session.session_key
+        user_key = USER_CACHE_KEY.format(self.user.pk)
+        other_worker = SharedStoreCache('', {})
+        self.assertIsNotNone(other_worker.get(session_key))
+        self.assertIsNotNone(other_worker.get(user_key))
+        self.authorized_client.get(reverse('users:logout'))
+        self.assertIsNone(other_worker.get(session_key))
+        self.assertIsNone(other_worker.get(user_key))
+
+    def test_inactive_snapshot_is_not_authenticated(self):
+        url = reverse('about:author')
+        self.authorized_client.get(url)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        caches['shared'].set(USER_CACHE_KEY.format(self.user.pk),
+                             _snapshot(User.objects.get(pk=self.user.pk)))
+        response = self.authorized_client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
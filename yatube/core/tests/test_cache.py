@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+
+from ..cache import SharedStoreCache
+
+
+class SharedStoreCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = SharedStoreCache('', {})
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+
+    def test_entries_are_shared_between_instances(self):
+        """Запись и удаление видны другому экземпляру кеша"""
+        other = SharedStoreCache('', {})
+        self.cache.set('key', {'value': 1})
+        self.assertEqual(other.get('key'), {'value': 1})
+        other.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_get_many_skips_missing_and_expired(self):
+        self.cache.set_many({'first': 1, 'second': 2})
+        self.cache.set('expired', 3, timeout=0)
+        self.assertEqual(
+            self.cache.get_many(['first', 'second', 'expired', 'missing']),
+            {'first': 1, 'second': 2})
+        self.assertEqual(self.cache.get_many([]), {})
+
+    def test_add_replaces_only_missing_or_expired(self):
+        self.assertTrue(self.cache.add('key', 1))
+        self.assertFalse(self.cache.add('key', 2))
+        self.assertEqual(self.cache.get('key'), 1)
+        self.cache.set('key', 3, timeout=0)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertTrue(self.cache.add('key', 4))
+        self.assertEqual(self.cache.get('key'), 4)
+
+    def test_never_expiring_entry(self):
+        self.cache.set('key', 1, timeout=None)
+        self.assertFalse(self.cache.add('key', 2))
+        self.assertTrue(self.cache.touch('key', 60))
+        self.assertTrue(self.cache.has_key('key'))
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from .. import db_router
+from ..db_router import (PrimaryReplicaRouter, replica_alias,
+                         set_replica_reads)
+from ..middleware.db_routing import PIN_PRIMARY_SESSION_KEY
+
+
+@mock.patch('core.db_router.replica_alias', return_value='replica')
+class PrimaryReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.addCleanup(set_replica_reads, False)
+
+    def test_reads_go_to_replica_only_when_enabled(self, replica_alias):
+        self.assertIsNone(self.router.db_for_read(Post))
+        set_replica_reads(True)
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertIsNone(self.router.db_for_read(Session))
+
+    def test_writes_go_to_primary(self, replica_alias):
+        set_replica_reads(True)
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_replica_is_not_migrated(self, replica_alias):
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+        self.assertIsNone(self.router.allow_migrate('default', 'posts'))
+
+
+class ReplicaAliasTest(SimpleTestCase):
+    def setUp(self):
+        db_router._replica.update(alias=None, checked=None)
+        self.addCleanup(db_router._replica.update, alias=None, checked=None)
+
+    def test_missing_replica_is_rechecked(self):
+        """Отсутствие реплики не запоминается навсегда, а найденная
+        реплика больше не перепроверяется"""
+        find = mock.patch.object(db_router, '_find_replica',
+                                 side_effect=[None, 'replica'])
+        clock = mock.patch.object(db_router.time, 'monotonic',
+                                  side_effect=[0, 1, 10])
+        with find as find, clock:
+            self.assertIsNone(replica_alias())
+            self.assertIsNone(replica_alias())
+            self.assertEqual(replica_alias(), 'replica')
+            self.assertEqual(replica_alias(), 'replica')
+        self.assertEqual(find.call_count, 2)
+
+
+class ReplicaRoutingMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.post = Post.objects.create(text='Тестовый текст', author=cls.user)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_write_pins_session_to_primary(self):
+        """После записи сессия читает только из основной базы"""
+        self.authorized_client.get(reverse('posts:index'))
+        self.assertNotIn(PIN_PRIMARY_SESSION_KEY,
+                         self.authorized_client.session)
+        self.authorized_client.post(
+            reverse('posts:add_comment', args=(self.post.id,)),
+            data={'text': 'комментарий'})
+        self.assertTrue(
+            self.authorized_client.session[PIN_PRIMARY_SESSION_KEY])
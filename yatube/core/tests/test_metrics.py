@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import User
+
+from .. import metrics
+
+TEMP_STATE_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    SHARED_STATE_PATH=os.path.join(TEMP_STATE_DIR, 'state.sqlite3'))
+class MetricsEndpointTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_latency_histogram_per_view(self):
+        """Гистограммы задержек собираются по имени URL"""
+        self.guest_client.get(reverse('about:author'))
+        self.guest_client.get(reverse('about:author'))
+        response = self.guest_client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('# TYPE yatube_request_duration_seconds histogram',
+                      body)
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket'
+            '{view="about:author",le="+Inf"}', body)
+        self.assertIn('yatube_request_queries_bucket{view="about:author"',
+                      body)
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics.observe('yatube_request_queries', 1, view='test')
+        metrics.observe('yatube_request_queries', 7, view='test')
+        body = metrics.exposition()
+        self.assertIn(
+            'yatube_request_queries_bucket{view="test",le="1"} 1', body)
+        self.assertIn(
+            'yatube_request_queries_bucket{view="test",le="10"} 2', body)
+        self.assertIn('yatube_request_queries_count{view="test"} 2', body)
+        self.assertIn('yatube_request_queries_sum{view="test"} 8', body)
+
+    def test_remote_non_staff_is_forbidden(self):
+        response = self.guest_client.get(reverse('metrics'),
+                                         REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 403)
+
+    def test_remote_staff_is_allowed(self):
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.guest_client.force_login(staff)
+        response = self.guest_client.get(reverse('metrics'),
+                                         REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 200)
+
+    def test_client_behind_proxy_is_forbidden(self):
+        """За локальным прокси решает адрес из X-Forwarded-For, а не
+        адрес самого прокси"""
+        response = self.guest_client.get(
+            reverse('metrics'), REMOTE_ADDR='127.0.0.1',
+            HTTP_X_FORWARDED_FOR='127.0.0.1, 203.0.113.5')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_is_allowed(self):
+        url = reverse('metrics')
+        response = self.guest_client.get(
+            url, REMOTE_ADDR='10.0.0.1', HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 403)
+        response = self.guest_client.get(
+            url, REMOTE_ADDR='10.0.0.1', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import User
+
+from .. import profiler
+from ..models import RequestProfile
+
+TEMP_PROFILES_DIR = tempfile.mkdtemp()
+
+
+@override_settings(PROFILER_OUTPUT_DIR=TEMP_PROFILES_DIR)
+class StaffProfilerTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='user')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PROFILES_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        profiler.reset_slots()
+        self.addCleanup(profiler.reset_slots)
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+        self.url = reverse('posts:profile', kwargs={'username': 'user'})
+
+    def test_staff_request_is_profiled(self):
+        """Запрос сотрудника с ?_profile сохраняет collapsed stacks"""
+        response = self.staff_client.get(self.url, {'_profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        profile = RequestProfile.objects.get()
+        self.assertEqual(response['X-Profile-Id'], str(profile.pk))
+        self.assertEqual(profile.view_name, 'posts:profile')
+        self.assertEqual(profile.user, self.staff)
+        with open(os.path.join(TEMP_PROFILES_DIR, profile.file_name)) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines) > 0, profile.samples > 0)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(count.isdigit())
+
+    def test_header_enables_profiling(self):
+        self.staff_client.get(self.url, HTTP_X_PROFILE='1')
+        self.assertTrue(RequestProfile.objects.exists())
+
+    def test_rate_limited_per_user(self):
+        """Повторный профиль в пределах паузы не снимается"""
+        self.staff_client.get(self.url, {'_profile': '1'})
+        response = self.staff_client.get(self.url, {'_profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(RequestProfile.objects.count(), 1)
+
+    def test_non_staff_is_not_profiled(self):
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(self.url, {'_profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_global_refusal_keeps_user_slot(self):
+        """Отказ по общей паузе не расходует паузу пользователя"""
+        self.assertTrue(profiler.acquire_slot(self.user.pk))
+        self.assertFalse(profiler.acquire_slot(self.staff.pk))
+        profiler._store().execute(
+            'DELETE FROM profiler_slot WHERE key = ?',
+            (profiler.GLOBAL_COOLDOWN_KEY,))
+        self.assertTrue(profiler.acquire_slot(self.staff.pk))
+
+    def test_failing_view_is_profiled(self):
+        with mock.patch('posts.views.get_object_or_404',
+                        side_effect=RuntimeError('сбой')):
+            with self.assertRaises(RuntimeError):
+                self.staff_client.get(self.url, {'_profile': '1'})
+        self.assertEqual(
+            RequestProfile.objects.get().view_name, 'posts:profile')
@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from .. import ratelimit
+
+RATELIMITS = {
+    'posts:post_create': {'methods': ('POST',), 'rate': '1/h', 'burst': 2},
+    'users:signup': {'methods': ('POST',), 'rate': '1/h', 'burst': 1},
+}
+
+
+@override_settings(RATELIMITS=RATELIMITS)
+class RateLimitTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ratelimited')
+
+    def setUp(self):
+        cache.clear()
+        ratelimit.reset()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def tearDown(self):
+        ratelimit.reset()
+
+    def test_bucket_refills(self):
+        """Корзина отдаёт burst токенов и пополняется со временем"""
+        key = 'test:refill'
+        self.assertEqual(ratelimit.take(key, 1.0, 2), 0)
+        self.assertEqual(ratelimit.take(key, 1.0, 2), 0)
+        self.assertGreater(ratelimit.take(key, 1.0, 2), 0)
+        self.assertEqual(ratelimit.take(key, 10.0 ** 6, 2), 0)
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate('30/m'), 0.5)
+
+    def test_post_create_is_limited_per_user(self):
+        """Лишний POST получает 429 до создания поста"""
+        url = reverse('posts:post_create')
+        for _ in range(2):
+            self.authorized_client.post(url, {'text': 'Тестовый текст'})
+        with self.assertNumQueries(0):
+            response = self.authorized_client.post(
+                url, {'text': 'Тестовый текст'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_get_is_not_limited(self):
+        url = reverse('posts:post_create')
+        for _ in range(3):
+            response = self.authorized_client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_guest_is_limited_per_ip(self):
+        url = reverse('users:signup')
+        Client(REMOTE_ADDR='10.0.0.1').post(url, {})
+        self.assertEqual(
+            Client(REMOTE_ADDR='10.0.0.1').post(url, {}).status_code, 429)
+        self.assertNotEqual(
+            Client(REMOTE_ADDR='10.0.0.2').post(url, {}).status_code, 429)
+
+    def test_guests_behind_proxy_have_own_buckets(self):
+        """За прокси гости различаются по X-Forwarded-For"""
+        url = reverse('users:signup')
+        proxy = {'REMOTE_ADDR': '127.0.0.1'}
+        Client(HTTP_X_FORWARDED_FOR='203.0.113.1', **proxy).post(url, {})
+        self.assertEqual(Client(
+            HTTP_X_FORWARDED_FOR='203.0.113.1', **proxy,
+        ).post(url, {}).status_code, 429)
+        self.assertNotEqual(Client(
+            HTTP_X_FORWARDED_FOR='203.0.113.2', **proxy,
+        ).post(url, {}).status_code, 429)
+
+    def test_prune_removes_idle_buckets(self):
+        ratelimit.take('test:idle', 1.0, 2)
+        self.assertEqual(ratelimit.prune(60), 0)
+        self.assertEqual(ratelimit.prune(-1), 1)
+        self.assertEqual(ratelimit.take('test:idle', 1.0, 2), 0)
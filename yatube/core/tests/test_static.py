@@ -0,0 +1,128 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from ..wsgi_static import (IMMUTABLE_CACHE_CONTROL, StaticFilesApplication,
+                           parse_accept_encoding)
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp()
+
+
+def django_application(environ, start_response):
+    start_response('404 Not Found', [])
+    return [b'django']
+
+
+@override_settings(
+    STATIC_ROOT=TEMP_STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage')
+class StaticPipelineTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, stdout=StringIO())
+        with open(os.path.join(TEMP_STATIC_ROOT, 'staticfiles.json')) as f:
+            cls.css = json.load(f)['paths']['css/bootstrap.min.css']
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.application = StaticFilesApplication(
+            django_application, root=TEMP_STATIC_ROOT, prefix='/static/')
+
+    def request(self, path, **environ):
+        environ.update(PATH_INFO=path, REQUEST_METHOD='GET')
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        body = b''.join(self.application(environ, start_response))
+        return response['status'], response['headers'], body
+
+    def test_collectstatic_hashes_and_compresses(self):
+        """collectstatic создаёт файл с хешем и его gzip-вариант"""
+        self.assertNotEqual(self.css, 'css/bootstrap.min.css')
+        path = os.path.join(TEMP_STATIC_ROOT, self.css)
+        self.assertTrue(os.path.exists(path + '.gz'))
+
+    def test_hashed_file_is_immutable_and_gzipped(self):
+        status, headers, body = self.request(
+            '/static/' + self.css, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Content-Type'], 'text/css')
+        self.assertEqual(int(headers['Content-Length']), len(body))
+        with open(os.path.join(TEMP_STATIC_ROOT, self.css), 'rb') as f:
+            self.assertEqual(gzip.decompress(body), f.read())
+
+    def test_encoding_respects_q_values(self):
+        """Кодировка с q=0 не отдаётся, выбирается наибольший q"""
+        static_file = self.application.files['/static/' + self.css]
+        static_file.variants.setdefault('br', static_file.variants['gzip'])
+        cases = {
+            'gzip, br': 'br',
+            'br;q=0, gzip': 'gzip',
+            'br;q=0.5, gzip;q=0.8': 'gzip',
+            'gzip;q=0, br;q=0': 'identity',
+            '*': 'br',
+            'identity': 'identity',
+            'xbrx, gzipper': 'identity',
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(static_file.choose(header), expected)
+        self.assertEqual(parse_accept_encoding('GZIP ; q=0.3'),
+                         {'gzip': 0.3})
+
+    def test_unversioned_file_is_not_immutable(self):
+        status, headers, _ = self.request('/static/css/bootstrap.min.css')
+        self.assertEqual(status, '200 OK')
+        self.assertNotEqual(headers['Cache-Control'],
+                            IMMUTABLE_CACHE_CONTROL)
+        self.assertNotIn('Content-Encoding', headers)
+
+    def test_etag_returns_not_modified(self):
+        _, headers, _ = self.request('/static/' + self.css)
+        status, _, body = self.request(
+            '/static/' + self.css, HTTP_IF_NONE_MATCH=headers['ETag'])
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, b'')
+
+    def test_each_encoding_has_own_etag(self):
+        """У сжатого и исходного вариантов разные ETag, и тег одного
+        варианта не даёт 304 для другого"""
+        path = '/static/' + self.css
+        _, plain, _ = self.request(path)
+        _, gzipped, _ = self.request(path, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotEqual(plain['ETag'], gzipped['ETag'])
+        status, _, _ = self.request(
+            path, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=plain['ETag'])
+        self.assertEqual(status, '200 OK')
+
+    def test_if_none_match_list_and_weak_tags(self):
+        path = '/static/' + self.css
+        _, headers, _ = self.request(path, HTTP_ACCEPT_ENCODING='gzip')
+        for header in (f'"other", {headers["ETag"]}',
+                       f'W/{headers["ETag"]}', '*'):
+            with self.subTest(header=header):
+                status, _, _ = self.request(
+                    path, HTTP_ACCEPT_ENCODING='gzip',
+                    HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(status, '304 Not Modified')
+
+    def test_other_paths_reach_django(self):
+        status, _, body = self.request('/static/missing.css')
+        self.assertEqual(body, b'django')
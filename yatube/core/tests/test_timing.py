@@ -0,0 +1,38 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+
+
+class ServerTimingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        Post.objects.create(text='Тестовый текст', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_server_timing_header(self):
+        """Ответ содержит Server-Timing с SQL, шаблонами и кешем"""
+        response = self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': 'author'}))
+        header = response['Server-Timing']
+        for metric in ('db;dur=', 'tpl;dur=', 'thumb;dur=',
+                       'cache;desc="hit=', 'total;dur='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, header)
+        self.assertNotIn('desc="0 queries"', header)
+
+    def test_structured_log_line(self):
+        with self.assertLogs('core.middleware.timing', 'INFO') as logs:
+            self.guest_client.get(reverse('about:author'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'about:author')
+        self.assertEqual(record['status'], 200)
+        self.assertIn('db_queries', record)
@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.template import TemplateDoesNotExist, engines
+from django.test import TestCase, override_settings
+
+from posts.models import Post, User
+from posts.utils import INDEX_COUNT_KEY
+
+from .. import warmup
+
+TEMP_REPORT_DIR = tempfile.mkdtemp()
+REPORT_PATH = os.path.join(TEMP_REPORT_DIR, 'warmup.jsonl')
+
+
+@override_settings(WARMUP_REPORT_PATH=REPORT_PATH)
+class WarmupTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Тестовый текст', author=author)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_REPORT_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+
+    def test_report_lists_every_step(self):
+        """Отчёт содержит длительность каждого шага и дописывается
+        в файл"""
+        report = warmup.run({'django_setup': 0.25})
+        self.assertEqual(report['steps']['django_setup'], {'ms': 250.0})
+        for name in ('templates', 'urls', 'translations', 'thumbnails',
+                     'database', 'post_counts', 'autocomplete'):
+            with self.subTest(step=name):
+                self.assertNotIn('error', report['steps'][name])
+        self.assertGreater(report['steps']['templates']['count'], 10)
+        self.assertGreater(report['steps']['urls']['count'], 0)
+        with open(REPORT_PATH) as report_file:
+            lines = report_file.read().splitlines()
+        self.assertEqual(json.loads(lines[-1]), report)
+
+    def test_primes_hot_cache_keys(self):
+        warmup.run()
+        self.assertEqual(caches['shared'].get(INDEX_COUNT_KEY), 1)
+
+    def test_failing_step_does_not_stop_warmup(self):
+        """Ошибка шага попадает в отчёт, остальные шаги выполняются"""
+        def broken():
+            raise RuntimeError('сломано')
+
+        warmup.register('broken', broken)
+        self.addCleanup(warmup._steps.pop, 'broken')
+        with self.assertLogs('core.warmup', 'ERROR'):
+            report = warmup.run()
+        self.assertIn('RuntimeError', report['steps']['broken']['error'])
+        self.assertIn('count', report['steps']['post_counts'])
+
+    def test_missing_template_does_not_stop_templates_step(self):
+        """Исчезнувший шаблон пропускается, остальные компилируются"""
+        backend = engines.all()[0]
+        get_template = backend.get_template
+
+        def flaky(name):
+            if name == 'posts/index.html':
+                raise TemplateDoesNotExist(name)
+            return get_template(name)
+
+        with mock.patch.object(backend, 'get_template', flaky), \
+                self.assertLogs('core.warmup', 'WARNING') as logs:
+            compiled = warmup.templates()
+        self.assertIn('posts/index.html', logs.output[0])
+        self.assertGreater(compiled, 10)
+
+    def test_command_prints_report(self):
+        out = StringIO()
+        call_command('warmup', stdout=out)
+        self.assertIn('total_ms', json.loads(out.getvalue()))
@@ -0,0 +1,11 @@
+from sorl.thumbnail.base import ThumbnailBackend
+
+from core import timing
+
+
+class TimedThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl-thumbnail, замеряющий время тега thumbnail."""
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        with timing.timer('thumb'):
+            return super().get_thumbnail(file_, geometry_string, **options)
@@ -0,0 +1,62 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+
+_local = threading.local()
+
+
+class RequestTimings:
+    """Счётчики и длительности одного запроса.
+
+    Вложенные замеры с одним именем (например, include внутри шаблона)
+    не суммируются повторно: учитывается только внешний."""
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.counts = defaultdict(int)
+        self._depth = defaultdict(int)
+
+    def incr(self, name, count=1):
+        self.counts[name] += count
+
+    @contextmanager
+    def timer(self, name):
+        self._depth[name] += 1
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self._depth[name] -= 1
+            if not self._depth[name]:
+                self.durations[name] += perf_counter() - started
+                self.counts[name] += 1
+
+
+def start():
+    _local.timings = RequestTimings()
+    return _local.timings
+
+
+def stop():
+    _local.timings = None
+
+
+def current():
+    return getattr(_local, 'timings', None)
+
+
+@contextmanager
+def timer(name):
+    timings = current()
+    if timings is None:
+        yield
+        return
+    with timings.timer(name):
+        yield
+
+
+def incr(name, count=1):
+    timings = current()
+    if timings is not None:
+        timings.incr(name, count)
@@ -1,4 +1,11 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+
+from core import metrics as metrics_store
+from core.http import client_ip
 
 
 def page_not_found(request, exception):
@@ -14,4 +21,22 @@ def permission_denied(request, exception):
 
 
 def csrf_failure(request, reason=''):
-    return render(request, 'core/403csrf.html')
\ No newline at end of file
+    return render(request, 'core/403csrf.html')
+
+
+def _metrics_token_valid(request):
+    token = settings.METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and constant_time_compare(header, f'Bearer {token}')
+
+
+def metrics(request):
+    """Метрики для staff, для запроса с METRICS_TOKEN и для адресов из
+    METRICS_ALLOWED_IPS; адрес берётся с учётом доверенного прокси."""
+    if not (request.user.is_staff
+            or _metrics_token_valid(request)
+            or client_ip(request) in settings.METRICS_ALLOWED_IPS):
+        raise PermissionDenied
+    return HttpResponse(
+        metrics_store.exposition(),
+        content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template import (TemplateDoesNotExist, TemplateSyntaxError,
+                             engines)
+from django.urls import NoReverseMatch, URLResolver, get_resolver, reverse
+from django.utils import formats, timezone, translation
+from django.utils.functional import empty
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = ('.html', '.txt', '.xml')
+
+_steps = {}
+
+
+def register(name, func):
+    """Регистрирует шаг прогрева; func возвращает число прогретых
+    объектов или None."""
+    _steps[name] = func
+
+
+def templates():
+    """Компилирует все шаблоны; без DEBUG они остаются в cached loader."""
+    compiled = 0
+    for backend in engines.all():
+        for directory in backend.template_dirs:
+            directory = Path(directory)
+            for path in directory.rglob('*'):
+                if path.suffix not in TEMPLATE_SUFFIXES:
+                    continue
+                name = path.relative_to(directory).as_posix()
+                try:
+                    backend.get_template(name)
+                except (TemplateSyntaxError, TemplateDoesNotExist) as exc:
+                    # Например, частичный шаблон подключает удалённый;
+                    # остальные шаблоны всё равно прогреваются.
+                    logger.warning('Шаблон %s не компилируется: %s',
+                                   name, exc)
+                    continue
+                compiled += 1
+    return compiled
+
+
+def _url_names(patterns, namespace=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            prefix = namespace
+            if pattern.namespace:
+                prefix = f'{namespace}{pattern.namespace}:'
+            yield from _url_names(pattern.url_patterns, prefix)
+        elif pattern.name:
+            yield f'{namespace}{pattern.name}', pattern.pattern.converters
+
+
+def urls():
+    """Заполняет обратные словари резолвера и разворачивает имена URL
+    без параметров."""
+    resolver = get_resolver()
+    resolved = 0
+    for name, converters in _url_names(resolver.url_patterns):
+        if converters:
+            # Для URL с параметрами достаточно заполненного reverse_dict
+            # пространства имён; сам путь зависит от аргументов.
+            namespace, _, _ = name.rpartition(':')
+            current = resolver
+            for part in filter(None, namespace.split(':')):
+                current = current.namespace_dict[part][1]
+            current.reverse_dict
+            continue
+        try:
+            reverse(name)
+        except NoReverseMatch:
+            continue
+        resolved += 1
+    resolver.resolve('/')
+    return resolved
+
+
+def translations():
+    """Загружает каталог переводов и форматы LANGUAGE_CODE."""
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('Login')
+        formats.get_format('DATETIME_INPUT_FORMATS')
+        formats.date_format(timezone.now(), 'DATE_FORMAT')
+    return None
+
+
+def thumbnails():
+    """Импортирует бэкенд, движок и хранилище sorl-thumbnail."""
+    from PIL import Image
+    from sorl.thumbnail import default
+
+    Image.init()
+    for lazy in (default.backend, default.engine, default.kvstore,
+                 default.storage):
+        if lazy._wrapped is empty:
+            lazy._setup()
+    return None
+
+
+def database():
+    connections['default'].ensure_connection()
+    return None
+
+
+STEPS = (
+    ('templates', templates),
+    ('urls', urls),
+    ('translations', translations),
+    ('thumbnails', thumbnails),
+    ('database', database),
+)
+
+
+def write_report(report):
+    """Дописывает отчёт строкой JSON в WARMUP_REPORT_PATH."""
+    path = settings.WARMUP_REPORT_PATH
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as report_file:
+        report_file.write(json.dumps(report, ensure_ascii=False) + '\n')
+
+
+def run(extra=None):
+    """Прогревает процесс и возвращает отчёт о длительности шагов.
+
+    Ошибка шага записывается в отчёт и не мешает запуску воркера.
+    В конце соединения с базой закрываются, чтобы их не унаследовали
+    процессы, созданные fork после прогрева."""
+    started = time.perf_counter()
+    steps = {name: {'ms': round(seconds * 1000, 1)}
+             for name, seconds in (extra or {}).items()}
+    for name, func in STEPS + tuple(_steps.items()):
+        step_started = time.perf_counter()
+        step = {}
+        try:
+            warmed = func()
+        except Exception as exc:
+            logger.exception('Шаг прогрева %s завершился ошибкой', name)
+            step['error'] = repr(exc)
+        else:
+            if warmed is not None:
+                step['count'] = warmed
+        step['ms'] = round((time.perf_counter() - step_started) * 1000, 1)
+        steps[name] = step
+    connections.close_all()
+    report = {
+        'pid': os.getpid(),
+        'started_at': round(time.time(), 3),
+        'total_ms': round((time.perf_counter() - started) * 1000, 1),
+        'steps': steps,
+    }
+    write_report(report)
+    logger.info('Прогрев воркера: %s', json.dumps(report, ensure_ascii=False))
+    return report
@@ -0,0 +1,155 @@
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+
+IMMUTABLE_CACHE_CONTROL: str = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL: str = 'public, max-age=60'
+MANIFEST_NAME: str = 'staticfiles.json'
+# Порядок важен: brotli сжимает сильнее, поэтому предпочтительнее.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+BLOCK_SIZE: int = 64 * 1024
+
+
+def parse_accept_encoding(header):
+    """Разбирает Accept-Encoding в словарь кодировка -> q."""
+    weights = {}
+    for item in header.split(','):
+        token, *params = item.split(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[token] = quality
+    return weights
+
+
+def etag_matches(header, etag):
+    """Совпадает ли etag с одним из тегов If-None-Match.
+
+    Теги сравниваются слабо, как требует RFC 7232 для If-None-Match:
+    префикс W/ не учитывается."""
+    if header.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == opaque:
+            return True
+    return False
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        content_type, _ = mimetypes.guess_type(path)
+        self.path = path
+        self.content_type = content_type or 'application/octet-stream'
+        self.cache_control = (IMMUTABLE_CACHE_CONTROL if immutable
+                              else DEFAULT_CACHE_CONTROL)
+        self.version = '{:x}-{:x}'.format(int(stat.st_mtime), stat.st_size)
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.variants = {'identity': (path, stat.st_size)}
+        for encoding, suffix in ENCODINGS:
+            if os.path.exists(path + suffix):
+                self.variants[encoding] = (
+                    path + suffix, os.path.getsize(path + suffix))
+
+    def etag(self, encoding):
+        """У каждого варианта свой тег: сжатое тело отличается от
+        исходного побайтно."""
+        if encoding == 'identity':
+            return f'"{self.version}"'
+        return f'"{self.version}-{encoding}"'
+
+    def choose(self, accept_encoding):
+        """Сжатый вариант с наибольшим q; при равных q — в порядке
+        ENCODINGS. Кодировки с q=0 не выбираются."""
+        weights = parse_accept_encoding(accept_encoding)
+        best, best_quality = 'identity', 0.0
+        for encoding, _ in ENCODINGS:
+            quality = weights.get(encoding, weights.get('*', 0.0))
+            if encoding in self.variants and quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+
+class StaticFilesApplication:
+    """WSGI-обёртка, отдающая собранную статику из STATIC_ROOT.
+
+    Файлы с хешем в имени получают immutable-кеширование на год, сжатые
+    варианты выбираются по Accept-Encoding, а тело отдаётся через
+    wsgi.file_wrapper, чтобы сервер мог использовать sendfile.
+    Остальные запросы передаются приложению Django."""
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = root or settings.STATIC_ROOT
+        self.prefix = prefix or settings.STATIC_URL
+        self.files = self._scan() if self.root else {}
+
+    def _scan(self):
+        hashed = set()
+        manifest_path = os.path.join(self.root, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as manifest:
+                hashed = set(json.load(manifest).get('paths', {}).values())
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(suffixes) or name == MANIFEST_NAME:
+                    continue
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, self.root).replace(
+                    os.sep, '/')
+                files[self.prefix + relative] = StaticFile(
+                    path, relative in hashed)
+        return files
+
+    def __call__(self, environ, start_response):
+        static_file = self.files.get(environ.get('PATH_INFO', ''))
+        if static_file is None:
+            return self.application(environ, start_response)
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed',
+                           [('Allow', 'GET, HEAD')])
+            return []
+
+        encoding = static_file.choose(
+            environ.get('HTTP_ACCEPT_ENCODING', ''))
+        etag = static_file.etag(encoding)
+        headers = [
+            ('Cache-Control', static_file.cache_control),
+            ('ETag', etag),
+            ('Last-Modified', static_file.last_modified),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if etag_matches(environ.get('HTTP_IF_NONE_MATCH', ''), etag):
+            start_response('304 Not Modified', headers)
+            return []
+
+        path, size = static_file.variants[encoding]
+        headers += [
+            ('Content-Type', static_file.content_type),
+            ('Content-Length', str(size)),
+        ]
+        if encoding != 'identity':
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(path, 'rb'), BLOCK_SIZE)
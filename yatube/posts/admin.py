@@ -2,6 +2,7 @@ from django.contrib import admin
 
 from .models import Group
 from .models import Post
+from .models import UserPurge
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -17,6 +18,14 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def save_model(self, request, obj, form, change):
+        if change:
+            # Как и в posts:post_edit, views не записывается из формы.
+            obj.save(update_fields=(*form.changed_data, 'text_html',
+                                    'excerpt_html', 'updated'))
+        else:
+            super().save_model(request, obj, form, change)
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = (
@@ -25,5 +34,13 @@ class GroupAdmin(admin.ModelAdmin):
     )
 
 
+class UserPurgeAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'requested',
+    )
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(UserPurge, UserPurgeAdmin)
@@ -1,5 +1,28 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save, pre_delete
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from core import warmup
+
+        from .groups import group_changed, prime
+        from .models import Group, Post
+        from .new_posts import post_created
+        from .utils import post_changed, post_deleting, prime_counts
+        post_save.connect(post_changed, sender=Post,
+                          dispatch_uid='posts_post_count_saved')
+        post_delete.connect(post_changed, sender=Post,
+                            dispatch_uid='posts_post_count_deleted')
+        pre_delete.connect(post_deleting, sender=Post,
+                           dispatch_uid='posts_tag_count_deleted')
+        post_save.connect(post_created, sender=Post,
+                          dispatch_uid='posts_new_posts_created')
+        warmup.register('post_counts', prime_counts)
+        post_save.connect(group_changed, sender=Group,
+                          dispatch_uid='posts_group_registry_saved')
+        post_delete.connect(group_changed, sender=Group,
+                            dispatch_uid='posts_group_registry_deleted')
+        warmup.register('groups', prime)
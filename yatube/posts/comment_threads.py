@@ -0,0 +1,54 @@
+from .models import Comment
+
+THREADS_COUNT: int = 20
+REPLY_DEPTH: int = 3
+# Символ больше любой цифры base36: path < prefix + PATH_END покрывает
+# всё поддерево prefix.
+PATH_END: str = '~'
+
+
+def _subtree(post_id, first_path, last_path):
+    return Comment.objects.filter(
+        post_id=post_id,
+        path__gte=first_path,
+        path__lt=last_path + PATH_END,
+    ).select_related('author').order_by('path')
+
+
+def _hide_inactive(comments):
+    """Помечает комментарии неактивных авторов как удалённые.
+
+    Ответы на них остаются, а вместо самого комментария шаблон выводит
+    заглушку. Удалённый комментарий без видимых ответов убирается
+    совсем. comments идут в порядке path, поэтому при обходе с конца
+    последний оставленный комментарий — ближайший следующий, и он
+    лежит в поддереве текущего, если его path начинается с path
+    текущего."""
+    kept = []
+    for comment in reversed(list(comments)):
+        comment.removed = not comment.author.is_active
+        if comment.removed and not (
+                kept and kept[-1].path.startswith(comment.path)):
+            continue
+        kept.append(comment)
+    kept.reverse()
+    return kept
+
+
+def thread(root):
+    """Вся ветка комментария root одним запросом по диапазону path
+    в индексе (post, path), уже в порядке обхода в глубину."""
+    return _hide_inactive(_subtree(root.post_id, root.path, root.path))
+
+
+def threads_for(post, count=THREADS_COUNT, depth=REPLY_DEPTH):
+    """Первые count веток поста с ответами до глубины depth.
+
+    Корни берутся из индекса (post, depth, path), ответы — одним
+    запросом по диапазону path от первого до последнего корня."""
+    roots = list(post.comments.filter(depth=0).order_by('path').values_list(
+        'path', flat=True)[:count])
+    if not roots:
+        return []
+    return _hide_inactive(
+        _subtree(post.pk, roots[0], roots[-1]).filter(depth__lte=depth))
@@ -0,0 +1,130 @@
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Follow
+
+FOLLOW_GRAPH_TIMEOUT: int = 60 * 60
+FOLLOWING_KEY: str = 'follow_graph:following:{}'
+FOLLOWERS_KEY: str = 'follow_graph:followers:{}'
+ID_TYPECODE: str = 'I'
+
+
+def _graph():
+    """Списки смежности лежат в общем для воркеров кеше: подписка в
+    одном процессе сбрасывает их для всех."""
+    return caches['shared']
+
+
+def _unpack(packed):
+    ids = array(ID_TYPECODE)
+    ids.frombytes(packed)
+    return ids
+
+
+# Кеш заполняется только из основной базы, чтобы не закрепить в нём
+# отставшую копию графа с реплики.
+def _following_queryset(user_id):
+    return Follow.objects.using(DEFAULT_DB_ALIAS).filter(
+        user_id=user_id).values_list('author_id', flat=True).order_by(
+        'author_id')
+
+
+def _followers_queryset(user_id):
+    return Follow.objects.using(DEFAULT_DB_ALIAS).filter(
+        author_id=user_id).values_list('user_id', flat=True).order_by(
+        'user_id')
+
+
+def _adjacency(keys):
+    """Возвращает отсортированные массивы id для ключей графа.
+
+    Отсутствующие в кеше списки смежности читаются из базы и
+    складываются в кеш упакованными в байты.
+    """
+    packed = _graph().get_many(keys.keys())
+    result = {}
+    missing = {}
+    for key, queryset in keys.items():
+        if key in packed:
+            result[key] = _unpack(packed[key])
+        else:
+            result[key] = array(ID_TYPECODE, queryset)
+            missing[key] = result[key].tobytes()
+    if missing:
+        _graph().set_many(missing, FOLLOW_GRAPH_TIMEOUT)
+    return result
+
+
+def following_ids(user_id):
+    key = FOLLOWING_KEY.format(user_id)
+    return _adjacency({key: _following_queryset(user_id)})[key]
+
+
+def follower_ids(user_id):
+    key = FOLLOWERS_KEY.format(user_id)
+    return _adjacency({key: _followers_queryset(user_id)})[key]
+
+
+def _contains(ids, value):
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+def followed_among(user_id, author_ids):
+    """Возвращает множество id авторов из author_ids,
+    на которых подписан пользователь user_id."""
+    if user_id is None:
+        return set()
+    ids = following_ids(user_id)
+    return {
+        author_id for author_id in author_ids if _contains(ids, author_id)
+    }
+
+
+def is_following(user_id, author_id):
+    if user_id is None:
+        return False
+    return _contains(following_ids(user_id), author_id)
+
+
+def follow_counts(user_id):
+    """Количество подписчиков и подписок пользователя за один запрос
+    к кешу."""
+    following_key = FOLLOWING_KEY.format(user_id)
+    followers_key = FOLLOWERS_KEY.format(user_id)
+    adjacency = _adjacency({
+        following_key: _following_queryset(user_id),
+        followers_key: _followers_queryset(user_id),
+    })
+    return {
+        'followers': len(adjacency[followers_key]),
+        'following': len(adjacency[following_key]),
+    }
+
+
+def follow(user, author):
+    """Подписывает user на author одним идемпотентным INSERT.
+
+    Повторная подписка игнорируется уникальным ограничением
+    unique_follow, поэтому параллельные запросы не создают дубликатов."""
+    Follow.objects.bulk_create(
+        [Follow(user=user, author=author)],
+        ignore_conflicts=True,
+    )
+    invalidate(user.id, author.id)
+
+
+def unfollow(user, author):
+    """Отписывает user от author одним DELETE."""
+    Follow.objects.filter(user=user, author=author).delete()
+    invalidate(user.id, author.id)
+
+
+def invalidate(user_id, author_id):
+    _graph().delete_many([
+        FOLLOWING_KEY.format(user_id),
+        FOLLOWERS_KEY.format(author_id),
+    ])
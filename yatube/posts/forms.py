@@ -1,5 +1,6 @@
 from django import forms
 
+from posts.groups import registry
 from posts.models import Post, Group, Comment
 
 
@@ -11,6 +12,36 @@ def validate_not_empty(value):
         )
 
 
+class GroupChoiceIterator(forms.models.ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for group in registry.all():
+            yield self.choice(group)
+
+    def __len__(self):
+        return len(registry.all()) + (self.field.empty_label is not None)
+
+
+class GroupChoiceField(forms.ModelChoiceField):
+    """Выбор группы по снимку реестра групп, без запросов к базе."""
+
+    iterator = GroupChoiceIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            group = registry.get(int(value))
+        except (TypeError, ValueError):
+            group = None
+        if group is None:
+            raise forms.ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice')
+        return group
+
+
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
@@ -20,10 +51,10 @@ class PostForm(forms.ModelForm):
                            validators=[validate_not_empty],
                            label='Текст поста',
                            help_text='Заполните текст поста')
-    group = forms.ModelChoiceField(required=False,
-                                   queryset=Group.objects.all(),
-                                   label='Группа',
-                                   help_text='Выберите группу')
+    group = GroupChoiceField(required=False,
+                             queryset=Group.objects.all(),
+                             label='Группа',
+                             help_text='Выберите группу')
 
 
 class CommentForm(forms.ModelForm):
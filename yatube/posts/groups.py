@@ -0,0 +1,104 @@
+import threading
+import time
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.http import Http404
+
+from core import shared_store
+
+from .models import Group
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS group_registry_version ('
+    'id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)',
+)
+
+
+def _store():
+    return shared_store.ensure_schema('groups', SCHEMA)
+
+
+class GroupRegistry:
+    """Снимок всех групп в памяти процесса по id и по slug.
+
+    Версия снимка лежит в общем для воркеров хранилище; при сохранении
+    или удалении группы она меняется, и каждый процесс при следующем
+    обращении один раз перечитывает группы из основной базы. Обращение
+    к реестру стоит одного чтения версии из хранилища."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._groups = []
+        self._by_id = {}
+        self._by_slug = {}
+
+    def _load(self, version):
+        # Реплика может отставать от версии, поэтому снимок читается
+        # из основной базы.
+        groups = list(Group.objects.using(DEFAULT_DB_ALIAS).order_by('id'))
+        with self._lock:
+            self._version = version
+            self._groups = groups
+            self._by_id = {group.pk: group for group in groups}
+            self._by_slug = {group.slug: group for group in groups}
+
+    def refresh(self):
+        row = _store().execute(
+            'SELECT version FROM group_registry_version').fetchone()
+        version = row[0] if row else 0
+        if version != self._version:
+            self._load(version)
+
+    def invalidate(self):
+        _store().execute(
+            'INSERT INTO group_registry_version (id, version) VALUES (1, ?) '
+            'ON CONFLICT (id) DO UPDATE SET version = excluded.version',
+            (time.time_ns(),))
+        with self._lock:
+            self._version = None
+
+    def all(self):
+        self.refresh()
+        return self._groups
+
+    def get(self, group_id):
+        self.refresh()
+        return self._by_id.get(group_id)
+
+    def get_by_slug(self, slug):
+        self.refresh()
+        return self._by_slug.get(slug)
+
+    def attach(self, posts):
+        """Подставляет постам группы из снимка вместо JOIN с таблицей
+        групп; группы, которых нет в снимке, загрузятся как обычно."""
+        self.refresh()
+        for post in posts:
+            group = self._by_id.get(post.group_id)
+            if group is not None:
+                post.group = group
+        return posts
+
+
+registry = GroupRegistry()
+
+
+def get_or_404(slug):
+    group = registry.get_by_slug(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    return group
+
+
+def group_changed(sender, **kwargs):
+    # Сбрасываем сразу, чтобы процесс увидел изменение, и ещё раз после
+    # фиксации транзакции, чтобы другой процесс не оставил себе снимок,
+    # прочитанный до неё.
+    registry.invalidate()
+    transaction.on_commit(registry.invalidate)
+
+
+def prime():
+    """Загружает снимок при прогреве воркера."""
+    return len(registry.all())
@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from posts.models import Comment, Post, PostTag, Tag
+from posts.rendering import (existing_usernames, extract_mentions,
+                             extract_tags, render_comment, render_post_body)
+from posts.utils import invalidate_tag_counts
+
+BATCH_SIZE: int = 500
+CHUNK_SIZE: int = 20000
+
+
+def process_batch(posts):
+    """Перерисовывает пачку постов и пересобирает их теги: упоминания
+    проверяются одним запросом на пачку."""
+    usernames = existing_usernames(set().union(
+        *(extract_mentions(post.text) for post in posts)))
+    tags_by_post = {}
+    for post in posts:
+        render_post_body(post, usernames)
+        tags_by_post[post.id] = extract_tags(post.text)
+    names = set().union(*tags_by_post.values())
+    # Новое время правки меняет ключи закешированных карточек во всех
+    # воркерах, и они перерисуются со ссылками.
+    updated = timezone.now()
+    for post in posts:
+        post.updated = updated
+    with transaction.atomic():
+        Post.objects.bulk_update(
+            posts, ('text_html', 'excerpt_html', 'updated'))
+        PostTag.objects.filter(post__in=posts).delete()
+        tags = {tag.name: tag for tag in Tag.get_or_create_many(names)}
+        PostTag.objects.bulk_create([
+            PostTag(tag=tags[name], post=post, pub_date=post.pub_date)
+            for post in posts for name in tags_by_post[post.id]
+        ])
+    return names
+
+
+def process_comment_batch(comments):
+    """Перерисовывает пачку комментариев; теги комментариев в индекс
+    не попадают."""
+    usernames = existing_usernames(set().union(
+        *(extract_mentions(comment.text) for comment in comments)))
+    for comment in comments:
+        render_comment(comment, usernames)
+    Comment.objects.bulk_update(comments, ('text_html',))
+    return set()
+
+
+def _batches(queryset, first_id, batch_size):
+    """Отдаёт пачки объектов queryset с id >= first_id по ключу."""
+    last_seen = first_id - 1
+    while True:
+        objects = list(queryset.filter(id__gt=last_seen)[:batch_size])
+        if not objects:
+            return
+        yield objects
+        last_seen = objects[-1].id
+
+
+def process_range(first_id, last_id, batch_size=BATCH_SIZE,
+                  comments=False):
+    """Обрабатывает посты или комментарии с id в [first_id, last_id)
+    пачками по ключу."""
+    if comments:
+        model, fields, process = (
+            Comment, ('id', 'text'), process_comment_batch)
+    else:
+        model, fields, process = (
+            Post, ('id', 'text', 'pub_date', 'updated'), process_batch)
+    queryset = model.objects.filter(
+        id__gte=first_id, id__lt=last_id).only(*fields).order_by('id')
+    processed = 0
+    names = set()
+    for objects in _batches(queryset, first_id, batch_size):
+        names |= process(objects)
+        processed += len(objects)
+    return processed, names
+
+
+class Command(BaseCommand):
+    help = ('Заполняет обратный индекс тегов и ссылки на теги и '
+            'упоминания у существующих постов и комментариев. Диапазоны '
+            'id обрабатываются параллельно в нескольких процессах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов; на SQLite по умолчанию один, так как '
+                 'писать в базу может только одно соединение.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Сколько id обрабатывает одна задача.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def _ranges(self, model, options, comments=False):
+        bounds = model.objects.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            return []
+        chunk = options['chunk_size']
+        return [
+            (start, start + chunk, options['batch_size'], comments)
+            for start in range(bounds['first'], bounds['last'] + 1, chunk)
+        ]
+
+    def handle(self, *args, **options):
+        ranges = (self._ranges(Post, options)
+                  + self._ranges(Comment, options, comments=True))
+        if not ranges:
+            self.stdout.write('Постов нет.')
+            return
+        workers = options['workers']
+        if workers is None:
+            workers = 1 if connection.vendor == 'sqlite' else os.cpu_count()
+        if workers > 1:
+            # Дочерние процессы не должны делить соединение с родителем.
+            connections.close_all()
+            with ProcessPoolExecutor(workers) as executor:
+                results = list(executor.map(process_range, *zip(*ranges)))
+        else:
+            results = [process_range(*chunk_range) for chunk_range in ranges]
+        processed = {False: 0, True: 0}
+        for chunk_range, (count, _) in zip(ranges, results):
+            processed[chunk_range[-1]] += count
+        invalidate_tag_counts(set().union(*(names for _, names in results)))
+        self.stdout.write(f'Обработано постов: {processed[False]}, '
+                          f'комментариев: {processed[True]}')
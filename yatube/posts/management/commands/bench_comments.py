@@ -0,0 +1,93 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+
+from core.bench import summarize
+from posts import comment_threads
+from posts.models import PATH_STEP, Comment, Post, User, path_segment
+
+
+class Command(BaseCommand):
+    help = ('Создаёт пост с глубоко вложенным обсуждением и сравнивает '
+            'выборку веток по path с рекурсивной загрузкой ответов. '
+            'Данные откатываются после замера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=50)
+        parser.add_argument('--depth', type=int, default=20)
+        parser.add_argument('--replies', type=int, default=3,
+                            help='Ответов на каждом уровне ветки.')
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def seed(self, post, author, options):
+        """Строит ветки: на каждом уровне replies ответов, вглубь
+        продолжается только первый. id и path назначаются сразу, чтобы
+        обойтись bulk_create."""
+        next_id = (Comment.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        comments = []
+
+        def add(parent_path):
+            nonlocal next_id
+            path = parent_path + path_segment(next_id)
+            comments.append(Comment(
+                id=next_id, post=post, author=author, text='Ответ',
+                path=path, depth=len(path) // PATH_STEP - 1,
+                parent_id=int(parent_path[-PATH_STEP:], 36)
+                if parent_path else None))
+            next_id += 1
+            return path
+
+        for _ in range(options['threads']):
+            path = add('')
+            for _ in range(options['depth']):
+                children = [add(path) for _ in range(options['replies'])]
+                path = children[0]
+        Comment.objects.bulk_create(comments, batch_size=500)
+        return len(comments)
+
+    def _recursive(self, comments):
+        result = []
+        for comment in comments:
+            result.append(comment)
+            result += self._recursive(
+                comment.replies.select_related('author').order_by('id'))
+        return result
+
+    def _measure(self, func, repeat):
+        samples = []
+        started = time.perf_counter()
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                sample_started = time.perf_counter()
+                rows = len(func())
+                samples.append(time.perf_counter() - sample_started)
+        report = summarize(samples, time.perf_counter() - started)
+        report.update(queries=len(queries), rows=rows)
+        return report
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            author, _ = User.objects.get_or_create(username='bench_comments')
+            post = Post.objects.create(text='Обсуждение', author=author)
+            total = self.seed(post, author, options)
+            roots = post.comments.filter(depth=0).order_by('path')
+            root = roots.first()
+            report = {
+                'comments': total,
+                'threads_for': self._measure(
+                    lambda: comment_threads.threads_for(post),
+                    options['repeat']),
+                'thread': self._measure(
+                    lambda: comment_threads.thread(root), options['repeat']),
+                'recursive_thread': self._measure(
+                    lambda: self._recursive([root]), options['repeat']),
+                'recursive_all': self._measure(
+                    lambda: self._recursive(roots.select_related('author')),
+                    1),
+            }
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
@@ -0,0 +1,62 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import Template, Context
+from django.template.loader import get_template
+
+from core.bench import summarize
+from posts.utils import QUANTITY, CachedCountPaginator
+
+# Прежний шаблон пагинатора со ссылкой на каждую страницу.
+FULL_RANGE_TEMPLATE = Template(
+    '{% for i in page_obj.paginator.page_range %}'
+    '{% if page_obj.number == i %}'
+    '<li class="page-item active"><span class="page-link">{{ i }}</span>'
+    '</li>{% else %}<li class="page-item">'
+    '<a class="page-link" href="?page={{ i }}">{{ i }}</a></li>'
+    '{% endif %}{% endfor %}'
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает размер и время отрисовки полного и оконного '
+            'пагинатора для ленты заданной длины.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def _measure(self, render, repeat):
+        samples = []
+        size = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            render_started = time.perf_counter()
+            size = len(render().encode())
+            samples.append(time.perf_counter() - render_started)
+        report = summarize(samples, time.perf_counter() - started)
+        report['bytes'] = size
+        return report
+
+    def handle(self, *args, **options):
+        objects = range(options['posts'])
+        page_number = Paginator(objects, QUANTITY).num_pages // 2
+        full_page = Paginator(objects, QUANTITY).page(page_number)
+        windowed_page = CachedCountPaginator(objects, QUANTITY).page(
+            page_number)
+        windowed_template = get_template('posts/includes/paginator.html')
+
+        report = {
+            'pages': full_page.paginator.num_pages,
+            'full_range': self._measure(
+                lambda: FULL_RANGE_TEMPLATE.render(
+                    Context({'page_obj': full_page})),
+                options['repeat']),
+            'windowed': self._measure(
+                lambda: windowed_template.render(
+                    {'page_obj': windowed_page}),
+                options['repeat']),
+        }
+        self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
@@ -0,0 +1,270 @@
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+
+from core.bench import WsgiClient, summarize
+from posts.models import Comment, Follow, Group, Post, User
+from posts.rendering import render_post_body
+
+BATCH_SIZE: int = 5000
+TEXT_POOL_SIZE: int = 500
+LOGGED_IN_CLIENTS: int = 20
+# За сколько секунд до запуска разнесены даты созданных постов.
+PUB_DATE_SPAN: int = 365 * 24 * 60 * 60
+
+# Доля каждого типа запроса в нагрузке.
+REQUEST_MIX = (
+    ('posts:index', 30),
+    ('posts:index?page', 5),
+    ('posts:post_detail', 20),
+    ('posts:profile', 15),
+    ('posts:group_list', 10),
+    ('posts:follow_index', 8),
+    ('posts:post_create', 2),
+    ('posts:post_create:post', 2),
+    ('posts:post_edit', 1),
+    ('posts:add_comment', 4),
+    ('posts:profile_follow', 2),
+    ('posts:profile_unfollow', 1),
+)
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими данными и прогоняет смешанную '
+            'нагрузку по всем URL posts через WSGI_APPLICATION в процессе '
+            'без ограничения частоты запросов. Запускайте только на '
+            'отдельной базе: нагрузка пишет в неё.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help='Сначала заполнить базу данными.')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--follow-alpha', type=float, default=1.5,
+                            help='Параметр Парето для числа подписок.')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--warmup', type=int, default=100)
+        parser.add_argument('--random-seed', type=int, default=42)
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['random_seed'])
+        if options['seed']:
+            self.seed(options)
+        report = self.replay(options)
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output)
+        self.stdout.write(output)
+
+    def _bulk(self, model, rows, **kwargs):
+        for start in range(0, len(rows), BATCH_SIZE):
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    rows[start:start + BATCH_SIZE], **kwargs)
+
+    def _stream(self, model, make_row, total, **kwargs):
+        """Создаёт total записей пачками, не держа их все в памяти."""
+        for start in range(0, total, BATCH_SIZE):
+            rows = [make_row() for _ in range(min(BATCH_SIZE, total - start))]
+            with transaction.atomic():
+                model.objects.bulk_create(rows, **kwargs)
+
+    def seed(self, options):
+        started = time.perf_counter()
+        fake = Faker('ru_RU')
+        fake.seed_instance(options['random_seed'])
+        texts = [fake.paragraph(nb_sentences=5)
+                 for _ in range(TEXT_POOL_SIZE)]
+        password = make_password(None)
+        first_user_id = (User.objects.order_by('-id')
+                         .values_list('id', flat=True).first() or 0) + 1
+
+        self._bulk(User, [
+            User(username=f'bench_{first_user_id + i}',
+                 first_name=fake.first_name(), last_name=fake.last_name(),
+                 password=password)
+            for i in range(options['users'])
+        ])
+        user_ids = list(User.objects.filter(
+            username__startswith='bench_').values_list('id', flat=True))
+        self._bulk(Group, [
+            Group(title=f'Группа {i}', slug=f'bench-{first_user_id}-{i}',
+                  description=texts[i % len(texts)])
+            for i in range(options['groups'])
+        ])
+        group_ids = list(Group.objects.values_list('id', flat=True))
+
+        # Популярность авторов по закону Ципфа: немногие пишут и
+        # собирают подписчиков больше остальных.
+        weights = list(accumulate(1 / rank
+                                  for rank in range(1, len(user_ids) + 1)))
+
+        def make_post():
+            post = Post(
+                text=self.random.choice(texts),
+                author_id=self.random.choices(user_ids,
+                                              cum_weights=weights)[0],
+                group_id=(self.random.choice(group_ids)
+                          if self.random.random() < 0.5 else None))
+            render_post_body(post)
+            return post
+
+        last_post_id = (Post.objects.order_by('-id')
+                        .values_list('id', flat=True).first() or 0)
+        self._stream(Post, make_post, options['posts'])
+        self._spread_pub_dates(last_post_id, options['posts'])
+
+        follows = []
+        for user_id in user_ids:
+            count = min(len(user_ids) - 1,
+                        int(self.random.paretovariate(
+                            options['follow_alpha'])))
+            for author_id in set(self.random.choices(
+                    user_ids, cum_weights=weights, k=count)):
+                if author_id != user_id:
+                    follows.append(Follow(user_id=user_id,
+                                          author_id=author_id))
+        self._bulk(Follow, follows, ignore_conflicts=True)
+
+        post_range = Post.objects.order_by('id').values_list('id', flat=True)
+        first_post, last_post = post_range.first(), post_range.last()
+        self._stream(Comment, lambda: Comment(
+            post_id=self.random.randint(first_post, last_post),
+            author_id=self.random.choice(user_ids),
+            text=self.random.choice(texts)[:200],
+        ), options['comments'])
+        self.stderr.write(
+            f'Данные созданы за {time.perf_counter() - started:.1f} с')
+
+    def _spread_pub_dates(self, after_id, total):
+        """Разносит даты постов с id > after_id по PUB_DATE_SPAN.
+
+        bulk_create ставит всем постам одно время auto_now_add, и
+        порядок лент вырождается; даты растут вместе с id, как при
+        настоящей публикации. bulk_update записывает поле как есть."""
+        now = timezone.now()
+        offsets = iter(sorted(
+            (self.random.uniform(0, PUB_DATE_SPAN) for _ in range(total)),
+            reverse=True))
+        queryset = Post.objects.only('id').order_by('id')
+        last_seen = after_id
+        while True:
+            posts = list(queryset.filter(id__gt=last_seen)[:BATCH_SIZE])
+            if not posts:
+                break
+            for post, offset in zip(posts, offsets):
+                post.pub_date = now - timedelta(seconds=offset)
+            with transaction.atomic():
+                Post.objects.bulk_update(posts, ('pub_date',))
+            last_seen = posts[-1].id
+
+    def _request(self, kind, client, sample):
+        post_id = sample['post_id']
+        author = sample['author']
+        requests = {
+            'posts:index': lambda: client.get(reverse('posts:index')),
+            'posts:index?page': lambda: client.get(
+                reverse('posts:index'),
+                {'page': self.random.randint(2, 50)}),
+            'posts:post_detail': lambda: client.get(
+                reverse('posts:post_detail', args=(post_id,))),
+            'posts:profile': lambda: client.get(
+                reverse('posts:profile', args=(author,))),
+            'posts:group_list': lambda: client.get(
+                reverse('posts:group_list', args=(sample['group'],))),
+            'posts:follow_index': lambda: client.get(
+                reverse('posts:follow_index')),
+            'posts:post_create': lambda: client.get(
+                reverse('posts:post_create')),
+            'posts:post_create:post': lambda: client.post(
+                reverse('posts:post_create'),
+                {'text': f'Пост нагрузки {time.time()}'}),
+            'posts:post_edit': lambda: client.get(
+                reverse('posts:post_edit', args=(sample['own_post_id'],))),
+            'posts:add_comment': lambda: client.post(
+                reverse('posts:add_comment', args=(post_id,)),
+                {'text': 'Комментарий нагрузки'}),
+            'posts:profile_follow': lambda: client.get(
+                reverse('posts:profile_follow', args=(author,))),
+            'posts:profile_unfollow': lambda: client.get(
+                reverse('posts:profile_unfollow', args=(author,))),
+        }
+        return requests[kind]()
+
+    def replay(self, options):
+        # Иначе корзины RATELIMITS превращают часть запросов в быстрые
+        # ответы 429, и они попадают в замер как настоящие.
+        with override_settings(RATELIMITS={}):
+            return self._replay(options)
+
+    def _replay(self, options):
+        users = list(User.objects.filter(posts__isnull=False).distinct()
+                     .order_by('?')[:LOGGED_IN_CLIENTS])
+        post_ids = list(Post.objects.order_by('-id')
+                        .values_list('id', flat=True)[:1000])
+        slugs = list(Group.objects.values_list('slug', flat=True)[:100])
+        if not (users and post_ids and slugs):
+            raise SystemExit('Нет данных: запустите команду с --seed.')
+        clients = []
+        for user in users:
+            client = WsgiClient(user)
+            own_post_id = user.posts.values_list('id', flat=True).first()
+            clients.append((client, user, own_post_id))
+
+        kinds = [kind for kind, _ in REQUEST_MIX]
+        weights = [weight for _, weight in REQUEST_MIX]
+        latencies = defaultdict(list)
+        statuses = defaultdict(int)
+        total = options['warmup'] + options['requests']
+        started = time.perf_counter()
+        for number in range(total):
+            if number == options['warmup']:
+                latencies.clear()
+                statuses.clear()
+                started = time.perf_counter()
+            kind = self.random.choices(kinds, weights)[0]
+            client, user, own_post_id = self.random.choice(clients)
+            sample = {
+                'own_post_id': own_post_id,
+                'post_id': self.random.choice(post_ids),
+                'author': self.random.choice(users).username,
+                'group': self.random.choice(slugs),
+            }
+            request_started = time.perf_counter()
+            status = self._request(kind, client, sample)
+            latencies[kind].append(time.perf_counter() - request_started)
+            statuses[status] += 1
+        elapsed = time.perf_counter() - started
+
+        return {
+            'dataset': {
+                'users': User.objects.count(),
+                'posts': Post.objects.count(),
+                'groups': Group.objects.count(),
+                'follows': Follow.objects.count(),
+                'comments': Comment.objects.count(),
+            },
+            'elapsed_s': round(elapsed, 3),
+            'overall': summarize(
+                [value for values in latencies.values() for value in values],
+                elapsed),
+            'statuses': {str(code): count
+                         for code, count in sorted(statuses.items())},
+            'by_url': {kind: summarize(values, elapsed)
+                       for kind, values in sorted(latencies.items())},
+        }
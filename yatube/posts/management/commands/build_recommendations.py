@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import recommendations
+
+
+class Command(BaseCommand):
+    help = ('Предрасчитывает рекомендации «Кого почитать» по подпискам '
+            'друзей и общим комментариям.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id', dest='user_ids', type=int, action='append',
+            help='Пересчитать только указанных пользователей '
+                 '(можно повторять).',
+        )
+        parser.add_argument(
+            '--limit', type=int, default=recommendations.SUGGESTIONS_COUNT,
+            help='Сколько рекомендаций хранить на пользователя.',
+        )
+
+    def handle(self, *args, **options):
+        written = recommendations.build(
+            user_ids=options['user_ids'], limit=options['limit'])
+        self.stdout.write(f'Записано рекомендаций: {written}')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts import view_counts
+
+
+class Command(BaseCommand):
+    help = ('Записывает накопленные в общем буфере просмотры постов в '
+            'базу. Запускайте по расписанию и при остановке сайта.')
+
+    def handle(self, *args, **options):
+        flushed = view_counts.flush()
+        self.stdout.write(f'Обновлено постов: {flushed}')
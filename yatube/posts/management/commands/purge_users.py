@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from posts import purge
+from posts.models import UserPurge
+
+
+class Command(BaseCommand):
+    help = ('Удаляет пользователей из очереди на удаление вместе с '
+            'постами, комментариями, подписками и картинками. '
+            'Прерванный запуск можно повторить.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=purge.BATCH_SIZE,
+            help='Сколько строк удалять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между пачками в секундах, чтобы пропустить '
+                 'запросы сайта к базе.',
+        )
+
+    def handle(self, *args, **options):
+        for queued in UserPurge.objects.select_related('user'):
+            username = queued.user.username
+            deleted = purge.purge_user(
+                queued.user, options['batch_size'], options['pause'])
+            self.stdout.write(
+                f'{username}: постов {deleted["posts"]}, комментариев '
+                f'{deleted["comments"]}, подписок {deleted["follows"]}')
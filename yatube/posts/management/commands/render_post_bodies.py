@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.rendering import render_post_body
+
+BATCH_SIZE: int = 500
+
+
+class Command(BaseCommand):
+    help = 'Заполняет text_html и excerpt_html у существующих постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перерисовать и уже заполненные посты.')
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.only('id', 'text').order_by('id')
+        if not options['all']:
+            queryset = queryset.filter(text_html='')
+        last_id = 0
+        rendered = 0
+        while True:
+            batch = list(
+                queryset.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            for post in batch:
+                render_post_body(post)
+            Post.objects.bulk_update(batch, ('text_html', 'excerpt_html'))
+            rendered += len(batch)
+            last_id = batch[-1].id
+        self.stdout.write(f'Обработано постов: {rendered}')
@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:16
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+BATCH_SIZE: int = 500
+
+
+def collapse_duplicate_follows(apps, schema_editor):
+    """Оставляет по одной подписке на каждую пару (user, author).
+
+    Дубликаты удаляются пачками, чтобы не держать блокировку
+    на всю таблицу подписок."""
+    Follow = apps.get_model('posts', 'Follow')
+    db_alias = schema_editor.connection.alias
+    duplicates = (
+        Follow.objects.using(db_alias)
+        .values('user_id', 'author_id')
+        .annotate(rows=Count('id'), keep_id=Min('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for pair in list(duplicates):
+        while True:
+            batch = list(
+                Follow.objects.using(db_alias)
+                .filter(user_id=pair['user_id'], author_id=pair['author_id'])
+                .exclude(id=pair['keep_id'])
+                .values_list('id', flat=True)[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            Follow.objects.using(db_alias).filter(id__in=batch).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_auto_20230329_2314'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            collapse_duplicate_follows,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        ),
+    ]
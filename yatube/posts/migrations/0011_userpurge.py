@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0010_post_rendered_body'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPurge',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('requested', models.DateTimeField(auto_now_add=True, verbose_name='Дата запроса')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='purge', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Удаление пользователя',
+                'verbose_name_plural': 'Очередь удаления пользователей',
+                'ordering': ('requested',),
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE: int = 500
+PATH_STEP: int = 8
+BASE36: str = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def path_segment(comment_id):
+    segment = ''
+    while comment_id:
+        comment_id, digit = divmod(comment_id, 36)
+        segment = BASE36[digit] + segment
+    return segment.rjust(PATH_STEP, '0')
+
+
+def fill_root_paths(apps, schema_editor):
+    """Существующие комментарии становятся корнями своих веток."""
+    Comment = apps.get_model('posts', 'Comment')
+    db_alias = schema_editor.connection.alias
+    last_id = 0
+    while True:
+        batch = list(
+            Comment.objects.using(db_alias).filter(id__gt=last_id)
+            .order_by('id').only('id')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for comment in batch:
+            comment.path = path_segment(comment.id)
+        Comment.objects.using(db_alias).bulk_update(batch, ['path'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Глубина'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='posts.Comment', verbose_name='Ответ на'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=248, verbose_name='Путь в дереве'),
+        ),
+        migrations.RunPython(fill_root_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comment_post_path'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'depth', 'path'], name='comment_post_depth_path'),
+        ),
+    ]
@@ -1,8 +1,25 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+
+from .rendering import (TAG_MAX_LEN, extract_tags, render_comment,
+                        render_post_body)
+from .utils import invalidate_tag_counts
 
 User = get_user_model()
 TEXT_LEN: int = 15
+# Сегмент пути комментария — его id в base36 фиксированной ширины,
+# поэтому сортировка по path даёт обход дерева в глубину.
+PATH_STEP: int = 8
+MAX_COMMENT_DEPTH: int = 30
+BASE36: str = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def path_segment(comment_id):
+    segment = ''
+    while comment_id:
+        comment_id, digit = divmod(comment_id, 36)
+        segment = BASE36[digit] + segment
+    return segment.rjust(PATH_STEP, '0')
 
 
 class Group(models.Model):
@@ -20,10 +37,21 @@ class Group(models.Model):
 
 class Post(models.Model):
     text = models.TextField()
+    text_html = models.TextField(
+        'HTML текста',
+        blank=True,
+        editable=False)
+    excerpt_html = models.TextField(
+        'HTML анонса',
+        blank=True,
+        editable=False)
     pub_date = models.DateTimeField(
         'Дата публикации',
         auto_now_add=True,
         db_index=True)
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -40,10 +68,39 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    views = models.PositiveIntegerField(
+        'Просмотры',
+        default=0,
+        editable=False)
 
     def __str__(self):
         return self.text[:TEXT_LEN]
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        render_post_body(self)
+        super().save(*args, **kwargs)
+        self.sync_tags(adding)
+
+    def sync_tags(self, adding=False):
+        """Обновляет обратный индекс тегов поста.
+
+        У нового поста без тегов и у правки без изменения тегов
+        записей в индекс нет."""
+        names = extract_tags(self.text)
+        old_names = set() if adding else set(
+            self.post_tags.values_list('tag__name', flat=True))
+        if names == old_names:
+            return
+        if old_names:
+            self.post_tags.all().delete()
+        if names:
+            PostTag.objects.bulk_create([
+                PostTag(tag=tag, post=self, pub_date=self.pub_date)
+                for tag in Tag.get_or_create_many(names)
+            ])
+        invalidate_tag_counts(names | old_names)
+
     class Meta:
         ordering = ('-pub_date', 'author')
         verbose_name = 'Пост'
@@ -73,10 +130,60 @@ class Comment(models.Model):
         'Дата комментария',
         auto_now_add=True,
     )
+    text_html = models.TextField(
+        'HTML комментария',
+        blank=True,
+        editable=False,
+    )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='replies',
+        verbose_name='Ответ на',
+    )
+    path = models.CharField(
+        'Путь в дереве',
+        max_length=PATH_STEP * (MAX_COMMENT_DEPTH + 1),
+        blank=True,
+        editable=False,
+    )
+    depth = models.PositiveSmallIntegerField(
+        'Глубина',
+        default=0,
+        editable=False,
+    )
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('post', 'path'),
+                         name='comment_post_path'),
+            models.Index(fields=('post', 'depth', 'path'),
+                         name='comment_post_depth_path'),
+        )
 
     def __str__(self):
         return self.text[:30]
 
+    def save(self, *args, **kwargs):
+        """Путь зависит от id, поэтому новый комментарий дописывает его
+        вторым UPDATE в той же транзакции."""
+        render_comment(self)
+        if self.path:
+            return super().save(*args, **kwargs)
+        if self.parent is not None and self.parent.depth >= MAX_COMMENT_DEPTH:
+            # Слишком глубокие ответы прикрепляются к предельному уровню.
+            self.parent = self.parent.parent
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            prefix = self.parent.path if self.parent is not None else ''
+            self.path = prefix + path_segment(self.pk)
+            self.depth = len(self.path) // PATH_STEP - 1
+            Comment.objects.filter(pk=self.pk).update(
+                path=self.path, depth=self.depth)
+
+
 class Follow(models.Model):
     user = models.ForeignKey(
         User,
@@ -89,4 +196,155 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Подписчик',
         related_name='following'
-    )
\ No newline at end of file
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow',
+            ),
+        )
+
+
+class Recommendation(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+        related_name='recommendations',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Рекомендуемый автор',
+        related_name='recommended_to',
+    )
+    score = models.PositiveIntegerField('Вес рекомендации')
+
+    class Meta:
+        ordering = ('-score',)
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_recommendation',
+            ),
+        )
+        indexes = (
+            models.Index(fields=('user', '-score'),
+                         name='recommendation_user_score'),
+        )
+
+
+class UserPurge(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+        related_name='purge',
+    )
+    requested = models.DateTimeField('Дата запроса', auto_now_add=True)
+
+    class Meta:
+        ordering = ('requested',)
+        verbose_name = 'Удаление пользователя'
+        verbose_name_plural = 'Очередь удаления пользователей'
+
+    def __str__(self):
+        return str(self.user)
+
+
+class Notification(models.Model):
+    NEW_POST = 'post'
+    NEW_COMMENT = 'comment'
+    KINDS = (
+        (NEW_POST, 'Новый пост автора'),
+        (NEW_COMMENT, 'Новый комментарий к посту'),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Получатель',
+        related_name='notifications',
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор события',
+        related_name='+',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='+',
+    )
+    kind = models.CharField('Тип', max_length=16, choices=KINDS)
+    is_read = models.BooleanField('Прочитано', default=False)
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        ordering = ('-id',)
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        indexes = (
+            models.Index(fields=('recipient', '-id'),
+                         name='notification_inbox'),
+            models.Index(fields=('recipient', 'is_read'),
+                         name='notification_unread'),
+        )
+
+    def __str__(self):
+        return f'{self.get_kind_display()}: {self.post_id}'
+
+
+class Tag(models.Model):
+    name = models.CharField('Тег', max_length=TAG_MAX_LEN, unique=True)
+
+    class Meta:
+        verbose_name = 'Тег'
+        verbose_name_plural = 'Теги'
+
+    def __str__(self):
+        return f'#{self.name}'
+
+    @classmethod
+    def get_or_create_many(cls, names):
+        """Теги с именами names; недостающие создаются одним INSERT."""
+        cls.objects.bulk_create([cls(name=name) for name in names],
+                                ignore_conflicts=True)
+        return cls.objects.filter(name__in=names)
+
+
+class PostTag(models.Model):
+    """Обратный индекс тегов. pub_date скопирована из поста, чтобы
+    страница тега читалась по индексу (tag, pub_date, post) без
+    сортировки."""
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        verbose_name='Тег',
+        related_name='post_tags',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='post_tags',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('post', 'tag'),
+                name='unique_post_tag',
+            ),
+        )
+        indexes = (
+            models.Index(fields=('tag', '-pub_date', 'post'),
+                         name='post_tag_feed'),
+        )
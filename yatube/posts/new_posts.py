@@ -0,0 +1,173 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+
+from core import jobs, shared_store
+
+from . import follow_graph
+from .models import Follow, Post
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS post_high_water_mark ('
+    'scope TEXT PRIMARY KEY, post_id INTEGER NOT NULL)',
+)
+MAX_COUNT: int = 100
+COUNT_TIMEOUT: int = 60
+COUNT_KEY: str = 'new_posts:{}:{}:{}'
+POLL_STEP: float = 0.5
+# Ограничение SQLite на число параметров в старых версиях — 999.
+SCOPES_PER_QUERY: int = 500
+
+INDEX_SCOPE: str = 'index'
+GROUP_SCOPE: str = 'group:{}'
+AUTHOR_SCOPE: str = 'author:{}'
+
+# Ожидающий запрос занимает поток воркера, поэтому ждать одновременно
+# могут не больше NEW_POSTS_MAX_WAITERS запросов процесса.
+_waiters = threading.BoundedSemaphore(settings.NEW_POSTS_MAX_WAITERS)
+
+
+def _store():
+    return shared_store.ensure_schema('new_posts', SCHEMA)
+
+
+def _raise(marks):
+    """Поднимает отметки scope -> id, никогда не опуская их."""
+    conn = _store()
+    with conn:
+        conn.executemany(
+            'INSERT INTO post_high_water_mark (scope, post_id) VALUES (?, ?) '
+            'ON CONFLICT (scope) DO UPDATE '
+            'SET post_id = MAX(post_id, excluded.post_id)',
+            list(marks.items()))
+
+
+def reset():
+    """Удаляет все отметки; они заново считаются по базе."""
+    _store().execute('DELETE FROM post_high_water_mark')
+
+
+def post_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    marks = {INDEX_SCOPE: instance.pk,
+             AUTHOR_SCOPE.format(instance.author_id): instance.pk}
+    if instance.group_id is not None:
+        marks[GROUP_SCOPE.format(instance.group_id)] = instance.pk
+    # Отметка поднимается после фиксации, иначе ожидающий клиент
+    # получит курсор поста, которого ещё не видно в базе.
+    jobs.enqueue(_raise, marks)
+
+
+def _read(scopes):
+    conn = _store()
+    marks = {}
+    scopes = list(scopes)
+    for start in range(0, len(scopes), SCOPES_PER_QUERY):
+        chunk = scopes[start:start + SCOPES_PER_QUERY]
+        marks.update(conn.execute(
+            'SELECT scope, post_id FROM post_high_water_mark '
+            'WHERE scope IN ({})'.format(', '.join('?' * len(chunk))),
+            chunk).fetchall())
+    return marks
+
+
+class Scope:
+    """Лента, для которой считаются новые посты."""
+
+    def __init__(self, name, queryset, marks, load):
+        self.name = name
+        self.queryset = queryset
+        self.marks = marks
+        self.load = load
+
+    def high_water_mark(self):
+        """Наибольший id поста в ленте по общему хранилищу отметок.
+
+        Отсутствующие отметки один раз считаются по базе."""
+        marks = _read(self.marks)
+        missing = [scope for scope in self.marks if scope not in marks]
+        if missing:
+            loaded = self.load(missing)
+            _raise(loaded)
+            marks.update(loaded)
+        return max(marks.values(), default=0)
+
+    def count_since(self, since, high_water_mark):
+        """Число постов новее since, не больше MAX_COUNT; кешируется по
+        отметке, поэтому клиенты с одним курсором делят один запрос."""
+        if high_water_mark <= since:
+            return 0
+        key = COUNT_KEY.format(self.name, since, high_water_mark)
+        count = cache.get(key)
+        if count is None:
+            count = self.queryset.filter(
+                id__gt=since, id__lte=high_water_mark,
+            ).order_by()[:MAX_COUNT].count()
+            cache.set(key, count, COUNT_TIMEOUT)
+        return count
+
+
+def _visible():
+    return Post.objects.filter(author__is_active=True)
+
+
+def _load_max(field, scope_format, ids):
+    rows = {}
+    for start in range(0, len(ids), SCOPES_PER_QUERY):
+        rows.update(
+            Post.objects.filter(
+                **{f'{field}__in': ids[start:start + SCOPES_PER_QUERY]})
+            .order_by().values_list(field).annotate(top=Max('id')))
+    return {scope_format.format(obj_id): rows.get(obj_id, 0)
+            for obj_id in ids}
+
+
+def index_scope():
+    return Scope(
+        INDEX_SCOPE, _visible(), [INDEX_SCOPE],
+        lambda missing: {INDEX_SCOPE: Post.objects.aggregate(
+            top=Max('id'))['top'] or 0})
+
+
+def group_scope(group):
+    return Scope(
+        GROUP_SCOPE.format(group.id), _visible().filter(group=group),
+        [GROUP_SCOPE.format(group.id)],
+        lambda missing: _load_max('group_id', GROUP_SCOPE, [group.id]))
+
+
+def follow_scope(user):
+    author_ids = list(follow_graph.following_ids(user.id))
+
+    def load(missing):
+        return _load_max('author_id', AUTHOR_SCOPE, [
+            int(scope.split(':')[1]) for scope in missing])
+
+    # Подписки в запросе к основной базе — подзапросом: их список не
+    # ограничен и не должен передаваться параметрами.
+    followed = Follow.objects.filter(user=user).values('author_id')
+    return Scope(
+        f'follow:{user.id}', _visible().filter(author_id__in=followed),
+        [AUTHOR_SCOPE.format(author_id) for author_id in author_ids], load)
+
+
+def wait_for_posts(scope, since, timeout):
+    """Ждёт до timeout секунд, пока отметка ленты не превысит since.
+
+    Пока ждёт, читает только общее хранилище отметок и не обращается
+    к основной базе. Если все места ожидающих заняты, отвечает сразу."""
+    high_water_mark = scope.high_water_mark()
+    if high_water_mark > since or not _waiters.acquire(blocking=False):
+        return high_water_mark
+    try:
+        deadline = time.monotonic() + timeout
+        while high_water_mark <= since and time.monotonic() < deadline:
+            time.sleep(POLL_STEP)
+            high_water_mark = scope.high_water_mark()
+    finally:
+        _waiters.release()
+    return high_water_mark
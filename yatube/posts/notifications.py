@@ -0,0 +1,90 @@
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from . import follow_graph
+from .models import Comment, Notification, Post
+
+BATCH_SIZE: int = 1000
+INBOX_SIZE: int = 20
+UNREAD_KEY: str = 'notifications:unread:{}'
+# Счётчик, посчитанный до фиксации рассылки, может вернуться в кеш
+# после её сброса; короткое время жизни ограничивает такую ошибку.
+UNREAD_TIMEOUT: int = 60
+
+
+def _counters():
+    """Счётчики непрочитанного лежат в общем для воркеров кеше: их
+    сбрасывает фоновая задача одного процесса, а показывают все."""
+    return caches['shared']
+
+
+def _fan_out(recipient_ids, actor_id, post_id, kind):
+    """Создаёт уведомления пачками, каждую в своей транзакции."""
+    recipient_ids = list(recipient_ids)
+    for start in range(0, len(recipient_ids), BATCH_SIZE):
+        batch = recipient_ids[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            Notification.objects.bulk_create([
+                Notification(recipient_id=recipient_id, actor_id=actor_id,
+                             post_id=post_id, kind=kind)
+                for recipient_id in batch
+            ])
+        _counters().delete_many([UNREAD_KEY.format(recipient_id)
+                                 for recipient_id in batch])
+
+
+def notify_followers(post_id):
+    """Уведомляет подписчиков автора о новом посте."""
+    post = Post.objects.filter(pk=post_id).only('id', 'author_id').first()
+    if post is None:
+        return
+    _fan_out(follow_graph.follower_ids(post.author_id), post.author_id,
+             post.id, Notification.NEW_POST)
+
+
+def notify_comment(comment_id):
+    """Уведомляет автора поста о новом комментарии."""
+    comment = Comment.objects.select_related('post').filter(
+        pk=comment_id).first()
+    if comment is None or comment.post.author_id == comment.author_id:
+        return
+    _fan_out([comment.post.author_id], comment.author_id, comment.post_id,
+             Notification.NEW_COMMENT)
+
+
+def unread_count(user):
+    """Число непрочитанных уведомлений; без запроса к базе, пока
+    значение в кеше.
+
+    Считается по основной базе: отставшая реплика закрепила бы в кеше
+    число, которое рассылка только что сбросила."""
+    key = UNREAD_KEY.format(user.pk)
+    counters = _counters()
+    count = counters.get(key)
+    if count is None:
+        count = Notification.objects.using(DEFAULT_DB_ALIAS).filter(
+            recipient=user, is_read=False).count()
+        counters.set(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def inbox_page(user, before=None, size=INBOX_SIZE):
+    """Страница входящих по ключу id: уведомления старше before.
+
+    Возвращает уведомления и id для ссылки на следующую страницу."""
+    queryset = Notification.objects.filter(recipient=user).select_related(
+        'actor', 'post')
+    if before is not None:
+        queryset = queryset.filter(id__lt=before)
+    notifications = list(queryset.order_by('-id')[:size + 1])
+    if len(notifications) <= size:
+        return notifications, None
+    return notifications[:size], notifications[size - 1].id
+
+
+def mark_read(user, notifications):
+    ids = [notification.id for notification in notifications
+           if not notification.is_read]
+    if ids:
+        Notification.objects.filter(id__in=ids).update(is_read=True)
+        _counters().delete(UNREAD_KEY.format(user.pk))
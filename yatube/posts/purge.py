@@ -0,0 +1,90 @@
+import time
+
+from django.db import transaction
+from django.db.models import Q
+from sorl.thumbnail import delete as delete_image
+
+from . import follow_graph
+from .models import (Comment, Follow, Notification, Post, Recommendation,
+                     UserPurge)
+from .utils import (AUTHOR_COUNT_KEY, GROUP_COUNT_KEY, INDEX_COUNT_KEY,
+                    invalidate_counts)
+
+BATCH_SIZE: int = 500
+
+
+def soft_delete(user):
+    """Деактивирует пользователя и ставит его в очередь на удаление.
+
+    Контент неактивных авторов скрыт из лент сразу, а сами строки
+    удаляет purge_users небольшими пачками."""
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        UserPurge.objects.get_or_create(user=user)
+    group_ids = set(user.posts.exclude(group=None).values_list(
+        'group_id', flat=True).distinct())
+    invalidate_counts(
+        [INDEX_COUNT_KEY, AUTHOR_COUNT_KEY.format(user.id)]
+        + [GROUP_COUNT_KEY.format(group_id) for group_id in group_ids])
+
+
+def _batches(queryset, batch_size, *fields):
+    """Отдаёт пачки (pk, *fields), пока в queryset остаются строки.
+
+    Каждая пачка должна быть удалена до запроса следующей."""
+    while True:
+        rows = list(queryset.order_by('pk').values_list(
+            'pk', *fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+
+
+def _delete(model, rows):
+    """Удаляет пачку в отдельной транзакции, чтобы не держать
+    блокировку записи SQLite дольше одной пачки."""
+    with transaction.atomic():
+        return model.objects.filter(
+            pk__in=[row[0] for row in rows]).delete()[0]
+
+
+def purge_user(user, batch_size=BATCH_SIZE, pause=0):
+    """Удаляет пользователя и его контент пачками по batch_size.
+
+    Прерванную очистку можно просто запустить снова: каждая пачка
+    фиксируется отдельно, а пользователь удаляется последним."""
+    deleted = {'comments': 0, 'posts': 0, 'follows': 0}
+    notifications = Notification.objects.filter(
+        Q(recipient=user) | Q(actor=user) | Q(post__author=user))
+    for rows in _batches(notifications, batch_size):
+        _delete(Notification, rows)
+        time.sleep(pause)
+
+    comments = Comment.objects.filter(Q(author=user) | Q(post__author=user))
+    for rows in _batches(comments, batch_size):
+        deleted['comments'] += _delete(Comment, rows)
+        time.sleep(pause)
+
+    for rows in _batches(user.posts.all(), batch_size, 'image'):
+        deleted['posts'] += _delete(Post, rows)
+        for _, image in rows:
+            if image:
+                delete_image(image)
+        time.sleep(pause)
+
+    follows = Follow.objects.filter(Q(user=user) | Q(author=user))
+    for rows in _batches(follows, batch_size, 'user_id', 'author_id'):
+        deleted['follows'] += _delete(Follow, rows)
+        for _, follower_id, author_id in rows:
+            follow_graph.invalidate(follower_id, author_id)
+        time.sleep(pause)
+
+    recommendations = Recommendation.objects.filter(
+        Q(user=user) | Q(author=user))
+    for rows in _batches(recommendations, batch_size):
+        _delete(Recommendation, rows)
+
+    with transaction.atomic():
+        user.delete()
+    return deleted
@@ -0,0 +1,121 @@
+from collections import Counter, defaultdict
+from heapq import nlargest
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Comment, Follow, Recommendation, User
+
+SUGGESTIONS_COUNT: int = 5
+BATCH_SIZE: int = 1000
+# Сколько пользователей пересчитывается за одно чтение подграфа;
+# id передаются параметрами запроса.
+GRAPH_CHUNK: int = 500
+
+
+def _load_graph(user_ids=None):
+    """Читает подписки и комментарии в разреженные списки смежности.
+
+    С user_ids читается только окрестность этих пользователей: их
+    подписки, подписки тех, на кого они подписаны, и комментарии к
+    постам, которые они комментировали. Этого достаточно score_user."""
+    follows = Follow.objects.all()
+    comments = Comment.objects.filter(post__isnull=False)
+    if user_ids is not None:
+        followed = Follow.objects.filter(
+            user_id__in=user_ids).values('author_id')
+        follows = follows.filter(
+            Q(user_id__in=user_ids) | Q(user_id__in=followed))
+        comments = comments.filter(post_id__in=Comment.objects.filter(
+            author_id__in=user_ids).values('post_id'))
+
+    following = defaultdict(set)
+    for user_id, author_id in follows.values_list(
+            'user_id', 'author_id').iterator():
+        following[user_id].add(author_id)
+
+    commented = defaultdict(set)
+    commenters = defaultdict(set)
+    for author_id, post_id in comments.values_list(
+            'author_id', 'post_id').iterator():
+        commented[author_id].add(post_id)
+        commenters[post_id].add(author_id)
+    return following, commented, commenters
+
+
+def score_user(user_id, following, commented, commenters):
+    """Считает веса кандидатов для одного пользователя.
+
+    Каждый автор, на которого подписан тот, на кого подписан пользователь,
+    получает по очку за такую подписку; каждый комментатор тех же постов,
+    что и пользователь, получает по очку за общий пост."""
+    scores = Counter()
+    for followed_id in following.get(user_id, ()):
+        scores.update(following.get(followed_id, ()))
+    for post_id in commented.get(user_id, ()):
+        scores.update(commenters[post_id])
+    scores.pop(user_id, None)
+    for followed_id in following.get(user_id, ()):
+        scores.pop(followed_id, None)
+    return scores
+
+
+def _write(rows_by_user):
+    with transaction.atomic():
+        Recommendation.objects.filter(user_id__in=rows_by_user).delete()
+        Recommendation.objects.bulk_create(
+            [row for rows in rows_by_user.values() for row in rows],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def _subgraphs(user_ids):
+    """Пары (id пользователей, граф) для пересчёта: весь граф разом или
+    окрестности пользователей порциями по GRAPH_CHUNK."""
+    if user_ids is None:
+        yield list(User.objects.values_list('id', flat=True)), _load_graph()
+        return
+    user_ids = list(user_ids)
+    for start in range(0, len(user_ids), GRAPH_CHUNK):
+        chunk = user_ids[start:start + GRAPH_CHUNK]
+        yield chunk, _load_graph(chunk)
+
+
+def build(user_ids=None, limit=SUGGESTIONS_COUNT):
+    """Пересчитывает рекомендации для user_ids или для всех пользователей.
+
+    Возвращает количество записанных рекомендаций."""
+    written = 0
+    pending = {}
+    for chunk, graph in _subgraphs(user_ids):
+        for user_id in chunk:
+            scores = score_user(user_id, *graph)
+            pending[user_id] = [
+                Recommendation(user_id=user_id, author_id=author_id,
+                               score=score)
+                for author_id, score in nlargest(
+                    limit, scores.items(),
+                    key=lambda item: (item[1], -item[0]))
+            ]
+            written += len(pending[user_id])
+            if len(pending) >= BATCH_SIZE:
+                _write(pending)
+                pending = {}
+    if pending:
+        _write(pending)
+    return written
+
+
+def suggestions_for(user, limit=SUGGESTIONS_COUNT):
+    """Рекомендованные авторы одним запросом к предрасчитанной таблице.
+
+    Уже подписанные авторы отсекаются подзапросом в той же базе до
+    LIMIT, без передачи списка подписок параметрами."""
+    if not user.is_authenticated:
+        return []
+    followed = Follow.objects.filter(user=user).values('author_id')
+    return list(
+        User.objects.filter(recommended_to__user=user, is_active=True)
+        .exclude(id__in=followed)
+        .order_by('-recommended_to__score')[:limit]
+    )
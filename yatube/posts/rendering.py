@@ -0,0 +1,72 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.template.defaultfilters import linebreaksbr
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.text import Truncator
+
+EXCERPT_LEN: int = 300
+TAG_MAX_LEN: int = 50
+
+# '#' после '&' — это числовая HTML-сущность вроде &#39;, а не тег.
+TAG_RE = re.compile(r'(?<![\w&])#(\w{1,%d})' % TAG_MAX_LEN)
+MENTION_RE = re.compile(r'(?<![\w@])@(\w[\w.+-]{0,148}\w|\w)')
+
+
+def extract_tags(text):
+    return {name.lower() for name in TAG_RE.findall(text)}
+
+
+def extract_mentions(text):
+    return set(MENTION_RE.findall(text))
+
+
+def existing_usernames(names):
+    """Имена из names, которые есть среди пользователей.
+
+    Запрос к базе делается, только если names не пусто."""
+    if not names:
+        return set()
+    return set(get_user_model().objects.filter(
+        username__in=names).values_list('username', flat=True))
+
+
+def linkify(html, usernames):
+    """Превращает #теги и @упоминания существующих пользователей
+    в уже экранированном HTML в ссылки."""
+    def tag_link(match):
+        url = reverse('posts:tag_posts', args=(match.group(1).lower(),))
+        return f'<a href="{url}">#{match.group(1)}</a>'
+
+    def mention_link(match):
+        if match.group(1) not in usernames:
+            return match.group(0)
+        url = reverse('posts:profile', args=(match.group(1),))
+        return f'<a href="{url}">@{match.group(1)}</a>'
+
+    return MENTION_RE.sub(mention_link, TAG_RE.sub(tag_link, html))
+
+
+def render_text(text, usernames=frozenset()):
+    """HTML тела поста: экранированный текст с <br> вместо переносов
+    и ссылками на теги и упомянутых пользователей."""
+    return linkify(linebreaksbr(text, autoescape=True), usernames)
+
+
+def render_excerpt(text, usernames=frozenset()):
+    """Экранированный и обрезанный текст для лент."""
+    return linkify(escape(Truncator(text).chars(EXCERPT_LEN)), usernames)
+
+
+def render_post_body(post, usernames=None):
+    if usernames is None:
+        usernames = existing_usernames(extract_mentions(post.text))
+    post.text_html = render_text(post.text, usernames)
+    post.excerpt_html = render_excerpt(post.text, usernames)
+
+
+def render_comment(comment, usernames=None):
+    if usernames is None:
+        usernames = existing_usernames(extract_mentions(comment.text))
+    comment.text_html = render_text(comment.text, usernames)
@@ -0,0 +1,138 @@
+import glob
+import hashlib
+import os
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.urls import reverse
+
+from .models import Group, Post, User
+
+CHUNK_SIZE: int = 50000
+BATCH_SIZE: int = 2000
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class Section:
+    """Набор URL одной модели, разбитый на куски по диапазонам id."""
+
+    def __init__(self, queryset, url_field, url_name, lastmod_field=None):
+        self.queryset = queryset
+        self.fields = ('id', url_field) + (
+            (lastmod_field,) if lastmod_field else ())
+        self.url_name = url_name
+        self.lastmod_field = lastmod_field
+
+    def get_queryset(self):
+        return self.queryset()
+
+    def chunk_count(self):
+        max_id = self.get_queryset().aggregate(Max('id'))['id__max']
+        return 0 if max_id is None else max_id // CHUNK_SIZE + 1
+
+    def chunk_queryset(self, chunk):
+        return self.get_queryset().filter(
+            id__gte=chunk * CHUNK_SIZE, id__lt=(chunk + 1) * CHUNK_SIZE)
+
+    def fingerprint(self, chunk):
+        """Число строк куска и последнее изменение: кусок пересобирается,
+        только когда меняется одно из них."""
+        aggregates = {'count': Count('id'), 'max_id': Max('id')}
+        if self.lastmod_field:
+            aggregates['lastmod'] = Max(self.lastmod_field)
+        return self.chunk_queryset(chunk).aggregate(**aggregates)
+
+    def rows(self, chunk):
+        """Строки куска по возрастанию id пачками по BATCH_SIZE."""
+        queryset = self.chunk_queryset(chunk).order_by('id').values_list(
+            *self.fields)
+        last_id = -1
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:BATCH_SIZE])
+            if not batch:
+                return
+            yield from batch
+            last_id = batch[-1][0]
+
+    def entry(self, base_url, row):
+        loc = escape(base_url + reverse(self.url_name, args=(row[1],)))
+        if not self.lastmod_field:
+            return f'<url><loc>{loc}</loc></url>\n'
+        lastmod = row[2].strftime('%Y-%m-%dT%H:%M:%S+00:00')
+        return f'<url><loc>{loc}</loc><lastmod>{lastmod}</lastmod></url>\n'
+
+
+SECTIONS = {
+    'posts': Section(
+        lambda: Post.objects.filter(author__is_active=True),
+        'id', 'posts:post_detail', lastmod_field='updated'),
+    'groups': Section(
+        lambda: Group.objects.all(), 'slug', 'posts:group_list'),
+    'profiles': Section(
+        lambda: User.objects.filter(is_active=True),
+        'username', 'posts:profile'),
+}
+
+
+def index(base_url):
+    yield XML_HEADER
+    yield f'<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for name, section in SECTIONS.items():
+        for chunk in range(section.chunk_count()):
+            loc = escape(base_url + reverse(
+                'posts:sitemap_chunk',
+                kwargs={'section': name, 'chunk': chunk}))
+            yield f'<sitemap><loc>{loc}</loc></sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def _render(section, chunk, base_url):
+    yield XML_HEADER
+    yield f'<urlset xmlns="{SITEMAP_NS}">\n'
+    for row in section.rows(chunk):
+        yield section.entry(base_url, row)
+    yield '</urlset>\n'
+
+
+def cached_path(name, chunk, base_url):
+    """Путь к файлу куска для текущего отпечатка его диапазона id."""
+    section = SECTIONS[name]
+    fingerprint = hashlib.md5(repr(
+        (base_url, section.fingerprint(chunk))).encode()).hexdigest()
+    return os.path.join(settings.SITEMAP_CACHE_DIR,
+                        f'{name}-{chunk}-{fingerprint}.xml')
+
+
+def is_fresh(path):
+    return (os.path.exists(path) and time.time()
+            - os.path.getmtime(path) < settings.SITEMAP_MAX_AGE)
+
+
+def render_and_store(name, chunk, base_url, path):
+    """Отдаёт кусок по строкам, одновременно записывая его в path.
+
+    Файл подменяется атомарно и только если кусок выдан целиком;
+    старые версии куска удаляются."""
+    os.makedirs(settings.SITEMAP_CACHE_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=settings.SITEMAP_CACHE_DIR,
+                                     suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as temp_file:
+            for part in _render(SECTIONS[name], chunk, base_url):
+                temp_file.write(part)
+                yield part
+        for stale in glob.glob(os.path.join(
+                settings.SITEMAP_CACHE_DIR, f'{name}-{chunk}-*.xml')):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -0,0 +1,55 @@
+from hashlib import md5
+
+from django import template
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from posts.groups import registry
+
+register = template.Library()
+
+POST_CARD_TEMPLATE: str = 'includes/post_text.html'
+POST_CARD_TIMEOUT: int = 60 * 60
+POST_CARD_KEY: str = 'post_card:{}:{}'
+
+
+def post_card_version(post):
+    """Версия карточки меняется при правке поста, переименовании автора
+    и смене или правке группы."""
+    author = post.author
+    group = post.group
+    parts = [
+        post.updated.isoformat(),
+        author.username,
+        author.first_name,
+        author.last_name,
+    ]
+    if group is not None:
+        parts += [str(group.pk), group.slug, group.title]
+    return md5('\x1f'.join(parts).encode()).hexdigest()
+
+
+def post_card_key(post):
+    return POST_CARD_KEY.format(post.pk, post_card_version(post))
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Собирает карточки постов из кеша одним get_many и рендерит
+    только отсутствующие."""
+    posts = registry.attach(list(posts))
+    keys = [(post_card_key(post), post) for post in posts]
+    cached = cache.get_many([key for key, _ in keys])
+    card_template = get_template(POST_CARD_TEMPLATE)
+    cards = []
+    missed = {}
+    for key, post in keys:
+        card = cached.get(key)
+        if card is None:
+            card = card_template.render({'post': post})
+            missed[key] = card
+        cards.append(mark_safe(card))
+    if missed:
+        cache.set_many(missed, POST_CARD_TIMEOUT)
+    return cards
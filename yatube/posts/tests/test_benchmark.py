@@ -0,0 +1,26 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Post
+
+
+class BenchmarkCommandTest(TestCase):
+    def test_seed_and_replay_report(self):
+        """Команда создаёт данные и отдаёт JSON с перцентилями по URL"""
+        stdout = StringIO()
+        call_command('benchmark', seed=True, users=5, groups=2, posts=30,
+                     comments=10, requests=30, warmup=5,
+                     stdout=stdout, stderr=StringIO())
+        report = json.loads(stdout.getvalue())
+        self.assertGreaterEqual(report['dataset']['posts'], 30)
+        self.assertEqual(report['dataset']['users'], 5)
+        self.assertEqual(report['overall']['count'], 30)
+        for status in ('403', '429', '500'):
+            self.assertNotIn(status, report['statuses'])
+        self.assertGreater(
+            Post.objects.values('pub_date').distinct().count(), 1)
+        for summary in report['by_url'].values():
+            self.assertIn('p99_ms', summary)
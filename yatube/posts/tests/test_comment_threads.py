@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import comment_threads
+from ..models import MAX_COMMENT_DEPTH, Comment, Post, User
+
+
+class CommentThreadsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.post = Post.objects.create(text='Тестовый текст', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def comment(self, text, parent=None):
+        return Comment.objects.create(post=self.post, author=self.user,
+                                      text=text, parent=parent)
+
+    def test_path_orders_depth_first(self):
+        """Сортировка по path даёт обход дерева в глубину"""
+        first = self.comment('1')
+        second = self.comment('2')
+        reply = self.comment('1.1', first)
+        nested = self.comment('1.1.1', reply)
+        self.comment('2.1', second)
+        self.assertEqual(nested.depth, 2)
+        self.assertTrue(nested.path.startswith(reply.path))
+        self.assertEqual(
+            [comment.text for comment in comment_threads.threads_for(
+                self.post)],
+            ['1', '1.1', '1.1.1', '2', '2.1'])
+
+    def test_thread_is_one_query(self):
+        root = self.comment('1')
+        parent = root
+        for level in range(5):
+            parent = self.comment(f'ответ {level}', parent)
+        self.comment('другая ветка')
+        with self.assertNumQueries(1):
+            thread = comment_threads.thread(root)
+        self.assertEqual(len(thread), 6)
+
+    def test_threads_for_limits_depth_and_count(self):
+        for index in range(3):
+            parent = self.comment(f'ветка {index}')
+            for level in range(4):
+                parent = self.comment(f'ответ {level}', parent)
+        with self.assertNumQueries(2):
+            comments = comment_threads.threads_for(
+                self.post, count=2, depth=1)
+        self.assertEqual([comment.depth for comment in comments],
+                         [0, 1, 0, 1])
+
+    def test_depth_is_capped(self):
+        parent = self.comment('корень')
+        for level in range(MAX_COMMENT_DEPTH + 2):
+            parent = self.comment(f'ответ {level}', parent)
+        self.assertEqual(parent.depth, MAX_COMMENT_DEPTH)
+
+    def test_reply_via_form(self):
+        """Ответ через форму попадает в ветку родителя"""
+        root = self.comment('1')
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.id}),
+            {'text': 'Ответ', 'parent': root.id})
+        reply = Comment.objects.get(text='Ответ')
+        self.assertEqual(reply.parent, root)
+        response = self.authorized_client.get(reverse(
+            'posts:comment_thread',
+            kwargs={'post_id': self.post.id, 'comment_id': root.id}))
+        self.assertEqual(response.context['comments'], [root, reply])
+
+    def test_inactive_author_leaves_placeholder(self):
+        """Комментарий неактивного автора заменяется заглушкой, а ответы
+        активных пользователей остаются"""
+        removed_author = User.objects.create_user(username='removed')
+        removed = Comment.objects.create(post=self.post, author=removed_author,
+                                         text='удалённый')
+        self.comment('ответ', removed)
+        Comment.objects.create(post=self.post, author=removed_author,
+                               text='без ответов')
+        removed_author.is_active = False
+        removed_author.save()
+        comments = comment_threads.threads_for(self.post)
+        self.assertEqual([(comment.text, comment.removed)
+                          for comment in comments],
+                         [('удалённый', True), ('ответ', False)])
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}))
+        self.assertContains(response, 'Комментарий удалён')
+        self.assertContains(response, 'ответ')
+        self.assertNotContains(response, 'удалённый')
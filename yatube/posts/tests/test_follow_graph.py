@@ -0,0 +1,96 @@
+from django.core.cache import cache, caches
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache import SharedStoreCache
+
+from .. import follow_graph
+from ..models import Follow, User
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}')
+            for i in range(3)
+        ]
+        Follow.objects.create(user=cls.user, author=cls.authors[0])
+        Follow.objects.create(user=cls.user, author=cls.authors[2])
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_followed_among(self):
+        """Подписки на несколько авторов проверяются одним вызовом"""
+        author_ids = [author.id for author in self.authors]
+        self.assertEqual(
+            follow_graph.followed_among(self.user.id, author_ids),
+            {self.authors[0].id, self.authors[2].id})
+        with self.assertNumQueries(0):
+            follow_graph.followed_among(self.user.id, author_ids)
+
+    def test_follow_counts(self):
+        self.assertEqual(follow_graph.follow_counts(self.user.id),
+                         {'followers': 0, 'following': 2})
+        self.assertEqual(follow_graph.follow_counts(self.authors[0].id),
+                         {'followers': 1, 'following': 0})
+
+    def test_follow_invalidates_graph(self):
+        """Подписка и отписка сбрасывают закешированный граф"""
+        author = self.authors[1]
+        self.assertFalse(follow_graph.is_following(self.user.id, author.id))
+        self.authorized_client.get(
+            reverse('posts:profile_follow',
+                    kwargs={'username': author.username}))
+        self.assertTrue(follow_graph.is_following(self.user.id, author.id))
+        self.assertEqual(
+            follow_graph.follow_counts(author.id)['followers'], 1)
+
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow',
+                    kwargs={'username': author.username}))
+        self.assertFalse(follow_graph.is_following(self.user.id, author.id))
+        self.assertEqual(
+            follow_graph.follow_counts(author.id)['followers'], 0)
+
+    def test_follow_resets_graph_for_all_workers(self):
+        """Подписка в одном процессе сбрасывает граф в кеше другого"""
+        author = self.authors[1]
+        key = follow_graph.FOLLOWING_KEY.format(self.user.id)
+        follow_graph.following_ids(self.user.id)
+        other_worker = SharedStoreCache('', {})
+        self.assertIsNotNone(other_worker.get(key))
+        follow_graph.follow(self.user, author)
+        self.assertIsNone(other_worker.get(key))
+        self.assertTrue(follow_graph.is_following(self.user.id, author.id))
+
+    def test_repeated_follow_is_idempotent(self):
+        """Повторная подписка не создаёт дубликатов"""
+        author = self.authors[1]
+        url = reverse('posts:profile_follow',
+                      kwargs={'username': author.username})
+        self.authorized_client.get(url)
+        self.authorized_client.get(url)
+        self.assertEqual(
+            Follow.objects.filter(user=self.user, author=author).count(), 1)
+
+    def test_follow_and_unfollow_are_single_statements(self):
+        author = self.authors[1]
+        with self.assertNumQueries(1):
+            follow_graph.follow(self.user, author)
+        with self.assertNumQueries(1):
+            follow_graph.follow(self.user, author)
+        with self.assertNumQueries(1):
+            follow_graph.unfollow(self.user, author)
+
+    def test_anonymous_is_not_following(self):
+        self.assertFalse(
+            follow_graph.is_following(None, self.authors[0].id))
+        self.assertEqual(
+            follow_graph.followed_among(None, [self.authors[0].id]), set())
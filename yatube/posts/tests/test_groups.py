@@ -0,0 +1,103 @@
+import sqlite3
+from contextlib import closing
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..forms import PostForm
+from ..groups import GroupRegistry, registry
+from ..models import Group, Post, User
+
+
+class GroupRegistryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.other = Group.objects.create(
+            title='Другая', slug='other', description='Описание')
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        # Откат транзакции теста не меняет версию в общем хранилище.
+        registry.invalidate()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def shared_version(self):
+        with closing(sqlite3.connect(settings.SHARED_STATE_PATH)) as conn:
+            return conn.execute(
+                'SELECT version FROM group_registry_version').fetchone()[0]
+
+    def group_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in context.captured_queries
+                if 'posts_group' in query['sql']]
+
+    def test_lookups_after_load_skip_database(self):
+        """После загрузки снимка группы ищутся без запросов к базе"""
+        registry.all()
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.get_by_slug('group'), self.group)
+            self.assertEqual(registry.get(self.other.pk), self.other)
+            self.assertIsNone(registry.get_by_slug('missing'))
+
+    def test_other_process_sees_change_through_shared_store(self):
+        """Другой процесс узнаёт об изменении группы по версии в общем
+        хранилище и перечитывает группы из основной базы"""
+        other_process = GroupRegistry()
+        self.assertEqual(len(other_process.all()), 2)
+        with self.assertNumQueries(0):
+            other_process.all()
+        version = self.shared_version()
+        Group.objects.filter(pk=self.other.pk).update(slug='renamed')
+        registry.invalidate()
+        cache.clear()
+        self.assertNotEqual(self.shared_version(), version)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                other_process.get_by_slug('renamed').pk, self.other.pk)
+
+    def test_pages_do_not_query_groups(self):
+        """Ленты, пост и форма поста берут группы из реестра"""
+        registry.all()
+        for url in (reverse('posts:index'),
+                    reverse('posts:group_list', args=('group',)),
+                    reverse('posts:profile', args=('author',)),
+                    reverse('posts:post_detail', args=(self.post.pk,)),
+                    reverse('posts:post_create'),
+                    reverse('posts:post_edit', args=(self.post.pk,))):
+            with self.subTest(url=url):
+                self.assertEqual(self.group_queries(url), [])
+
+    def test_save_and_delete_invalidate(self):
+        group = Group.objects.get(pk=self.other.pk)
+        group.slug = 'renamed'
+        group.save()
+        self.assertIsNone(registry.get_by_slug('other'))
+        self.assertEqual(registry.get_by_slug('renamed').pk, group.pk)
+        group.delete()
+        response = self.authorized_client.get(
+            reverse('posts:group_list', args=('renamed',)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_form_group_choices(self):
+        form = PostForm()
+        self.assertEqual(
+            [value for value, _ in form.fields['group'].choices],
+            ['', self.group.pk, self.other.pk])
+        form = PostForm({'text': 'Текст', 'group': self.other.pk})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['group'], self.other)
+        form = PostForm({'text': 'Текст', 'group': 10 ** 6})
+        self.assertIn('group', form.errors)
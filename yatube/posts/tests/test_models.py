@@ -1,6 +1,10 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
 from ..models import Group, Post, User
+from ..rendering import render_excerpt
 
 TEXT_LEN: int = 15
 
@@ -28,3 +32,27 @@ class PostModelTest(TestCase):
     def test_group_have_correct_title(self):
         """Проверяем, что у моделей корректно работает __str__."""
         self.assertEqual(PostModelTest.group.title, str(PostModelTest.group))
+
+
+class PostRenderedBodyTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def test_body_rendered_on_save(self):
+        """HTML текста и анонса считаются при сохранении поста"""
+        post = Post.objects.create(
+            author=self.user, text='<b>первая</b>\nвторая' + 'я' * 400)
+        self.assertTrue(post.text_html.startswith(
+            '&lt;b&gt;первая&lt;/b&gt;<br>вторая'))
+        self.assertEqual(len(post.excerpt_html), len(render_excerpt(
+            post.text)))
+        self.assertTrue(post.excerpt_html.endswith('…'))
+
+    def test_backfill_command(self):
+        post = Post.objects.create(author=self.user, text='строка\nстрока')
+        Post.objects.filter(pk=post.pk).update(text_html='', excerpt_html='')
+        call_command('render_post_bodies', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, 'строка<br>строка')
@@ -0,0 +1,113 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import new_posts
+from ..models import Follow, Group, Post, User
+
+
+class NewPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        new_posts.reset()
+        self.first = Post.objects.create(text='Первый', author=self.author)
+        self.addCleanup(new_posts.reset)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.url = reverse('posts:new_posts')
+
+    def get(self, **params):
+        params.setdefault('since', self.first.id)
+        return self.reader_client.get(self.url, params)
+
+    def test_counts_new_posts_per_scope(self):
+        """Считаются только посты ленты новее курсора"""
+        Post.objects.create(text='В группе', author=self.author,
+                            group=self.group)
+        Post.objects.create(text='Чужой', author=self.reader)
+        self.assertEqual(self.get().json()['count'], 2)
+        self.assertEqual(
+            self.get(scope='group', slug='group').json()['count'], 1)
+        self.assertEqual(self.get(scope='follow').json()['count'], 1)
+
+    @mock.patch.object(new_posts, 'SCOPES_PER_QUERY', 1)
+    def test_follow_scope_with_many_authors(self):
+        """Отметки подписок читаются пачками, а подписки в запросе
+        числа постов берутся подзапросом"""
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.reader, author=other)
+        caches['shared'].clear()
+        Post.objects.create(text='Автор', author=self.author)
+        last = Post.objects.create(text='Другой', author=other)
+        new_posts.reset()
+        scope = new_posts.follow_scope(self.reader)
+        self.assertEqual(scope.high_water_mark(), last.id)
+        self.assertEqual(scope.count_since(self.first.id, last.id), 2)
+        self.assertIn('SELECT', str(scope.queryset.query).split('IN', 1)[1])
+
+    def test_up_to_date_cursor_skips_database(self):
+        new_posts.index_scope().high_water_mark()
+        with self.assertNumQueries(0):
+            count = new_posts.index_scope().count_since(
+                self.first.id, self.first.id)
+        self.assertEqual(count, 0)
+
+    def test_etag_not_modified(self):
+        """Повторный запрос с тем же ETag получает 304"""
+        etag = self.get()['ETag']
+        response = self.reader_client.get(
+            self.url, {'since': self.first.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(text='Новый', author=self.author)
+        response = self.reader_client.get(
+            self.url, {'since': self.first.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_long_poll_returns_after_timeout(self):
+        started = time.monotonic()
+        response = self.get(wait=1)
+        self.assertGreaterEqual(time.monotonic() - started, 0.9)
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_long_poll_without_free_slot_returns_at_once(self):
+        """Когда все места ожидающих заняты, запрос не ждёт"""
+        with mock.patch.object(new_posts, '_waiters',
+                               threading.BoundedSemaphore(1)) as waiters:
+            waiters.acquire()
+            started = time.monotonic()
+            response = self.get(wait=5)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_mark_is_raised_by_job_after_commit(self):
+        """Отметку ленты поднимает задача, которая выполняется после
+        фиксации транзакции"""
+        with mock.patch('core.jobs.enqueue') as enqueue:
+            post = Post.objects.create(text='Новый', author=self.author)
+        enqueue.assert_any_call(new_posts._raise, {
+            new_posts.INDEX_SCOPE: post.id,
+            new_posts.AUTHOR_SCOPE.format(self.author.id): post.id,
+        })
+        self.assertEqual(
+            new_posts.index_scope().high_water_mark(), self.first.id)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.get(since='x').status_code, 400)
+        self.assertEqual(self.get(scope='nope').status_code, 400)
+        response = Client().get(self.url, {'scope': 'follow', 'since': 0})
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache import SharedStoreCache
+from core.db_router import set_replica_reads
+
+from .. import notifications
+from ..models import Follow, Notification, Post, User
+
+
+class NotificationsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.followers = [
+            User.objects.create_user(username=f'follower{i}')
+            for i in range(3)
+        ]
+        for follower in cls.followers:
+            Follow.objects.create(user=follower, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.follower_client = Client()
+        self.follower_client.force_login(self.followers[0])
+
+    def test_new_post_notifies_followers(self):
+        """Новый пост создаёт уведомления всем подписчикам автора"""
+        self.author_client.post(reverse('posts:post_create'),
+                                {'text': 'Тестовый текст'})
+        self.assertEqual(
+            set(Notification.objects.values_list('recipient', flat=True)),
+            {follower.id for follower in self.followers})
+
+    def test_comment_notifies_post_author(self):
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        self.follower_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.id}),
+            {'text': 'Комментарий'})
+        self.author_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.id}),
+            {'text': 'Свой комментарий'})
+        notification = Notification.objects.get()
+        self.assertEqual(notification.recipient, self.author)
+        self.assertEqual(notification.kind, Notification.NEW_COMMENT)
+
+    def test_unread_counter_is_cached(self):
+        """Счётчик в шапке берётся из кеша и сбрасывается в ящике"""
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        notifications.notify_followers(post.id)
+        url = reverse('about:author')
+        response = self.follower_client.get(url)
+        self.assertEqual(response.context['unread_notifications'], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                notifications.unread_count(self.followers[0]), 1)
+
+        self.follower_client.get(reverse('posts:notifications'))
+        response = self.follower_client.get(url)
+        self.assertEqual(response.context['unread_notifications'], 0)
+
+    def test_new_notification_resets_counter_for_all_workers(self):
+        """Сброс счётчика фоновой задачей виден кешу другого процесса"""
+        key = notifications.UNREAD_KEY.format(self.followers[0].pk)
+        self.assertEqual(notifications.unread_count(self.followers[0]), 0)
+        other_worker = SharedStoreCache('', {})
+        self.assertEqual(other_worker.get(key), 0)
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        notifications.notify_followers(post.id)
+        self.assertIsNone(other_worker.get(key))
+
+    @mock.patch('core.db_router.replica_alias', return_value='replica')
+    def test_unread_counter_is_read_from_primary(self, replica_alias):
+        """На страницах с чтением с реплики счётчик считается по
+        основной базе"""
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        notifications.notify_followers(post.id)
+        set_replica_reads(True)
+        self.addCleanup(set_replica_reads, False)
+        self.assertEqual(notifications.unread_count(self.followers[0]), 1)
+
+    def test_inbox_keyset_pagination(self):
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        for _ in range(5):
+            notifications.notify_followers(post.id)
+        first, before = notifications.inbox_page(self.followers[0], size=3)
+        second, last = notifications.inbox_page(
+            self.followers[0], before=before, size=3)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertIsNone(last)
+        self.assertLess(second[0].id, first[-1].id)
+        response = self.follower_client.get(
+            reverse('posts:notifications'), {'before': first[-1].id})
+        self.assertEqual(list(response.context['notifications']), second)
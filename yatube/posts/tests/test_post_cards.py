@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..templatetags.post_cards import POST_CARD_TEMPLATE
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author_user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='группа', slug='group_test', description='группа тестов')
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.author_user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.url = reverse('posts:profile', kwargs={'username': 'author'})
+
+    def test_cached_card_is_not_rendered_again(self):
+        """Карточка поста рендерится один раз и дальше берётся из кеша"""
+        response = self.guest_client.get(self.url)
+        self.assertTemplateUsed(response, POST_CARD_TEMPLATE)
+        response = self.guest_client.get(self.url)
+        self.assertTemplateNotUsed(response, POST_CARD_TEMPLATE)
+        self.assertContains(response, 'Тестовый текст')
+
+    def test_post_edit_changes_card(self):
+        self.guest_client.get(self.url)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        response = self.guest_client.get(self.url)
+        self.assertContains(response, 'Исправленный текст')
+
+    def test_group_and_author_rename_change_card(self):
+        self.guest_client.get(self.url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'новая группа'
+        group.save()
+        User.objects.filter(pk=self.author_user.pk).update(
+            first_name='Лев', last_name='Толстой')
+        response = self.guest_client.get(self.url)
+        self.assertContains(response, 'новая группа')
+        self.assertContains(response, 'Лев Толстой')
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import purge
+from ..models import Comment, Follow, Post, User, UserPurge
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class UserPurgeTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        self.spammer = User.objects.create_user(username='spammer')
+        self.posts = [
+            Post.objects.create(text=f'Пост {i}', author=self.spammer)
+            for i in range(3)
+        ]
+        self.posts[0].image = SimpleUploadedFile(
+            'small.gif', SMALL_GIF, content_type='image/gif')
+        self.posts[0].save()
+        Comment.objects.create(post=self.posts[1], author=self.reader,
+                               text='Ответ')
+        Follow.objects.create(user=self.reader, author=self.spammer)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_soft_delete_hides_content(self):
+        """После мягкого удаления контент пропадает из лент сразу"""
+        self.reader_client.get(reverse('posts:index'))
+        purge.soft_delete(self.spammer)
+        response = self.reader_client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 0)
+        for url in (
+            reverse('posts:profile', kwargs={'username': 'spammer'}),
+            reverse('posts:post_detail', kwargs={'post_id':
+                                                 self.posts[0].id}),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.reader_client.get(url).status_code, 404)
+        self.assertTrue(UserPurge.objects.filter(user=self.spammer).exists())
+        self.assertEqual(Post.objects.count(), 3)
+
+    def test_purge_deletes_in_batches(self):
+        """purge_users удаляет посты, комментарии, подписки и картинки"""
+        image_path = self.posts[0].image.path
+        self.assertTrue(os.path.exists(image_path))
+        purge.soft_delete(self.spammer)
+        call_command('purge_users', batch_size=1, pause=0, stdout=StringIO())
+        self.assertFalse(User.objects.filter(username='spammer').exists())
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(UserPurge.objects.exists())
+        self.assertFalse(os.path.exists(image_path))
+
+    def test_admin_delete_is_soft(self):
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.post(
+            reverse('admin:auth_user_delete', args=(self.spammer.id,)),
+            {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(User.objects.get(pk=self.spammer.pk).is_active)
+        self.assertEqual(Post.objects.count(), 3)
@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import recommendations
+from ..models import Comment, Follow, Post, Recommendation, User
+
+
+class RecommendationsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.popular = User.objects.create_user(username='popular')
+        cls.commenter = User.objects.create_user(username='commenter')
+        Follow.objects.create(user=cls.user, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.popular)
+        post = Post.objects.create(text='Тестовый текст', author=cls.friend)
+        Comment.objects.create(post=post, author=cls.user, text='первый')
+        Comment.objects.create(post=post, author=cls.commenter, text='второй')
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_build_scores_friends_of_friends_and_co_commenters(self):
+        """Рекомендуются авторы друзей и соседи по комментариям,
+        но не сам пользователь и не его подписки"""
+        call_command('build_recommendations', stdout=StringIO())
+        suggested = set(
+            Recommendation.objects.filter(user=self.user)
+            .values_list('author__username', flat=True))
+        self.assertEqual(suggested, {'popular', 'commenter'})
+
+    def test_incremental_build_touches_only_given_users(self):
+        recommendations.build(user_ids=[self.user.id])
+        self.assertFalse(
+            Recommendation.objects.exclude(user=self.user).exists())
+        recommendations.build(user_ids=[self.user.id])
+        self.assertEqual(
+            Recommendation.objects.filter(user=self.user).count(), 2)
+
+    def test_suggestions_are_read_in_one_query(self):
+        recommendations.build()
+        with self.assertNumQueries(1):
+            suggested = recommendations.suggestions_for(self.user)
+        self.assertIn(self.popular, suggested)
+
+    def test_suggestions_in_context(self):
+        recommendations.build()
+        for url in (reverse('posts:follow_index'),
+                    reverse('posts:profile', kwargs={'username': 'user'})):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertIn(self.popular, response.context['suggestions'])
+
+    def test_incremental_graph_is_neighbourhood_only(self):
+        """Для пересчёта одного пользователя читается только его
+        окрестность графа"""
+        stranger = User.objects.create_user(username='stranger')
+        Follow.objects.create(user=stranger, author=self.commenter)
+        following, commented, _ = recommendations._load_graph(
+            [self.user.id])
+        self.assertEqual(set(following), {self.user.id, self.friend.id})
+        self.assertEqual(set(commented), {self.user.id, self.commenter.id})
+
+    def test_followed_authors_do_not_shrink_suggestions(self):
+        """Уже отслеживаемые авторы отбрасываются до LIMIT"""
+        recommendations.build()
+        Follow.objects.create(user=self.user, author=self.popular)
+        suggested = recommendations.suggestions_for(self.user, limit=1)
+        self.assertEqual(suggested, [self.commenter])
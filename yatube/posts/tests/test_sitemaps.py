@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import sitemaps
+from ..models import Group, Post, User
+
+TEMP_SITEMAP_DIR = tempfile.mkdtemp()
+
+
+@override_settings(SITEMAP_CACHE_DIR=TEMP_SITEMAP_DIR)
+class SitemapTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.author, group=cls.group)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_SITEMAP_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+        for name in os.listdir(TEMP_SITEMAP_DIR):
+            os.remove(os.path.join(TEMP_SITEMAP_DIR, name))
+
+    def get_chunk(self, section):
+        response = self.guest_client.get(reverse(
+            'posts:sitemap_chunk', kwargs={'section': section, 'chunk': 0}))
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_index_lists_chunks(self):
+        response = self.guest_client.get(reverse('posts:sitemap'))
+        body = b''.join(response.streaming_content).decode()
+        for section in sitemaps.SECTIONS:
+            with self.subTest(section=section):
+                self.assertIn(f'/sitemap-{section}-0.xml', body)
+
+    def test_chunks_contain_urls(self):
+        """Куски содержат посты, группы и профили"""
+        self.assertIn(
+            'http://testserver' + reverse(
+                'posts:post_detail', kwargs={'post_id': self.post.id}),
+            self.get_chunk('posts'))
+        self.assertIn('/group/group/', self.get_chunk('groups'))
+        self.assertIn('/profile/author/', self.get_chunk('profiles'))
+
+    def test_chunk_is_cached_until_range_changes(self):
+        """Кусок берётся из файла, пока не изменится его диапазон id"""
+        self.get_chunk('posts')
+        self.assertEqual(len(os.listdir(TEMP_SITEMAP_DIR)), 1)
+        with self.assertNumQueries(1):
+            self.get_chunk('posts')
+
+        new_post = Post.objects.create(text='Новый пост', author=self.author)
+        body = self.get_chunk('posts')
+        self.assertIn(f'/posts/{new_post.id}/', body)
+        self.assertEqual(len(os.listdir(TEMP_SITEMAP_DIR)), 1)
+
+    def test_unknown_section(self):
+        response = self.guest_client.get(reverse(
+            'posts:sitemap_chunk', kwargs={'section': 'nope', 'chunk': 0}))
+        self.assertEqual(response.status_code, 404)
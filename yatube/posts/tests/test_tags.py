@@ -0,0 +1,112 @@
+from io import StringIO
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Post, PostTag, Tag, User
+from ..templatetags.post_cards import post_card_key
+from ..utils import TAG_COUNT_KEY
+
+
+class TagsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        self.guest_client = Client()
+
+    def test_tags_and_mentions_become_links(self):
+        """Теги и упоминания существующих пользователей — ссылки"""
+        post = Post.objects.create(
+            text="Привет @reader и @nobody, it's #Django", author=self.author)
+        self.assertIn(
+            f'<a href="{reverse("posts:profile", args=("reader",))}">'
+            '@reader</a>', post.text_html)
+        self.assertIn('@nobody', post.text_html)
+        self.assertNotIn('/profile/nobody/', post.text_html)
+        self.assertIn(
+            f'<a href="{reverse("posts:tag_posts", args=("django",))}">'
+            '#Django</a>', post.text_html)
+        self.assertEqual(
+            set(PostTag.objects.values_list('tag__name', flat=True)),
+            {'django'})
+        self.assertNotIn('/tags/39/', post.text_html)
+
+    def test_comment_is_linkified(self):
+        post = Post.objects.create(text='Текст', author=self.author)
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='@author #ответ')
+        self.assertIn('/profile/author/', comment.text_html)
+        self.assertIn('#ответ</a>', comment.text_html)
+
+    def test_edit_updates_index(self):
+        post = Post.objects.create(text='#старый', author=self.author)
+        post.text = '#новый'
+        post.save()
+        self.assertEqual(
+            list(post.post_tags.values_list('tag__name', flat=True)),
+            ['новый'])
+
+    def test_post_without_tags_skips_index(self):
+        with self.assertNumQueries(1):
+            Post.objects.create(text='Без тегов', author=self.author)
+
+    def test_tag_page(self):
+        """Страница тега показывает посты с тегом, новые сначала"""
+        first = Post.objects.create(text='#python раз', author=self.author)
+        second = Post.objects.create(text='#Python два', author=self.author)
+        Post.objects.create(text='без тега', author=self.author)
+        response = self.guest_client.get(
+            reverse('posts:tag_posts', kwargs={'name': 'python'}))
+        self.assertEqual(list(response.context['page_obj']),
+                         [second, first])
+
+    def test_backfill(self):
+        post = Post.objects.create(text='Текст', author=self.author)
+        Post.objects.filter(pk=post.pk).update(
+            text='Старый пост #архив @reader', text_html='')
+        call_command('backfill_tags', workers=1, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertIn('/profile/reader/', post.text_html)
+        self.assertTrue(Tag.objects.filter(name='архив').exists())
+        self.assertEqual(post.post_tags.count(), 1)
+
+    def test_backfill_renders_comments(self):
+        """Бэкфилл заполняет HTML комментариев, созданных до него"""
+        post = Post.objects.create(text='Текст', author=self.author)
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Текст')
+        Comment.objects.filter(pk=comment.pk).update(
+            text='@author #ответ', text_html='')
+        out = StringIO()
+        call_command('backfill_tags', stdout=out)
+        comment.refresh_from_db()
+        self.assertIn('/profile/author/', comment.text_html)
+        self.assertIn('#ответ</a>', comment.text_html)
+        self.assertIn('комментариев: 1', out.getvalue())
+
+    def test_backfill_bumps_updated(self):
+        """Бэкфилл меняет время правки, и ключ карточки поста тоже"""
+        post = Post.objects.create(text='Текст', author=self.author)
+        old_key = post_card_key(post)
+        call_command('backfill_tags', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertNotEqual(post_card_key(post), old_key)
+
+    def test_delete_resets_tag_count(self):
+        """Удаление поста сбрасывает счётчик его тега в общем кеше"""
+        post = Post.objects.create(text='#python', author=self.author)
+        url = reverse('posts:tag_posts', kwargs={'name': 'python'})
+        self.guest_client.get(url)
+        self.assertEqual(
+            caches['shared'].get(TAG_COUNT_KEY.format('python')), 1)
+        post.delete()
+        self.assertIsNone(
+            caches['shared'].get(TAG_COUNT_KEY.format('python')))
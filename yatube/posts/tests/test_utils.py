@@ -0,0 +1,59 @@
+from django.core.cache import cache, caches
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post, User
+from ..utils import (ELLIPSIS, INDEX_COUNT_KEY, QUANTITY,
+                     CachedCountPaginator)
+
+
+class WindowedPaginatorTest(TestCase):
+    def page_range(self, number, num_pages):
+        paginator = CachedCountPaginator(range(num_pages * QUANTITY),
+                                         QUANTITY)
+        return list(paginator.page(number).elided_page_range())
+
+    def test_short_range_is_not_elided(self):
+        self.assertEqual(self.page_range(3, 5), [1, 2, 3, 4, 5])
+
+    def test_middle_page_is_windowed(self):
+        """Показываются края, соседи текущей страницы и многоточия"""
+        self.assertEqual(
+            self.page_range(50, 100),
+            [1, ELLIPSIS, 48, 49, 50, 51, 52, ELLIPSIS, 100])
+
+    def test_edges(self):
+        self.assertEqual(self.page_range(1, 100),
+                         [1, 2, 3, ELLIPSIS, 100])
+        self.assertEqual(self.page_range(100, 100),
+                         [1, ELLIPSIS, 98, 99, 100])
+
+
+class CachedCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        Post.objects.create(text='Тестовый текст', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        self.guest_client = Client()
+
+    def test_count_is_cached(self):
+        paginator = CachedCountPaginator(Post.objects.all(), QUANTITY,
+                                         count_key=INDEX_COUNT_KEY)
+        self.assertEqual(paginator.count, 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                CachedCountPaginator(Post.objects.all(), QUANTITY,
+                                     count_key=INDEX_COUNT_KEY).count, 1)
+
+    def test_new_post_resets_counts(self):
+        """Новый пост сбрасывает закешированные счётчики лент"""
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        self.guest_client.get(url)
+        Post.objects.create(text='Второй пост', author=self.author)
+        response = self.guest_client.get(url)
+        self.assertEqual(response.context['quantity'], 2)
@@ -0,0 +1,96 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError
+from django.db.models import QuerySet
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.db_router import set_replica_reads
+
+from .. import view_counts
+from ..models import Post, User
+from ..rendering import render_post_body
+
+
+class ViewCountsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        cache.clear()
+        view_counts.flush()
+        self.post = Post.objects.create(text='Тестовый текст',
+                                        author=self.author)
+        self.guest_client = Client()
+        self.url = reverse('posts:post_detail',
+                           kwargs={'post_id': self.post.id})
+
+    def test_views_are_visible_before_flush(self):
+        """Просмотры видны сразу, хотя в базу ещё не записаны"""
+        self.guest_client.get(self.url)
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response.context['views'], 2)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).views, 0)
+        response = self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': 'author'}))
+        self.assertEqual(response.context['views'], 2)
+
+    def test_flush_writes_batched_update(self):
+        other = Post.objects.create(text='Второй пост', author=self.author)
+        for post in (self.post, self.post, other):
+            view_counts.record(post)
+        call_command('flush_view_counts', stdout=StringIO())
+        self.assertEqual(Post.objects.get(pk=self.post.pk).views, 2)
+        self.assertEqual(Post.objects.get(pk=other.pk).views, 1)
+        self.assertEqual(
+            view_counts.post_views(Post.objects.get(pk=self.post.pk)), 2)
+
+    @mock.patch('core.db_router.replica_alias', return_value='replica')
+    def test_flushed_views_are_not_taken_from_stale_replica(self, replica):
+        """После flush просмотры не уменьшаются, пока реплика отстаёт:
+        записанное число читается из основной базы"""
+        view_counts.record(self.post)
+        view_counts.record(self.post)
+        stale = Post.objects.get(pk=self.post.pk)
+        view_counts.flush()
+        set_replica_reads(True)
+        self.addCleanup(set_replica_reads, False)
+        self.assertEqual(stale.views, 0)
+        self.assertEqual(view_counts.post_views(stale), 2)
+        self.assertEqual(view_counts.author_views(self.author), 2)
+
+    def test_edit_does_not_overwrite_views(self):
+        """Правка поста не затирает записанные просмотры"""
+        client = Client()
+        client.force_login(self.author)
+        url = reverse('posts:post_edit', kwargs={'post_id': self.post.id})
+        view_counts.record(self.post)
+
+        def flush_during_edit(post):
+            view_counts.flush()
+            render_post_body(post)
+
+        # Просмотры записываются уже после того, как правка прочитала пост.
+        with mock.patch('posts.models.render_post_body',
+                        side_effect=flush_during_edit):
+            client.post(url, {'text': 'Новый текст'})
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((post.text, post.views), ('Новый текст', 1))
+
+    def test_failed_update_returns_views_to_buffer(self):
+        """Ошибка UPDATE не теряет забранные из буфера просмотры"""
+        view_counts.record(self.post)
+        with mock.patch.object(
+                QuerySet, 'update',
+                side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                view_counts.flush()
+        self.assertEqual(
+            view_counts.post_views(Post.objects.get(pk=self.post.pk)), 1)
+        self.assertEqual(view_counts.flush(), 1)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).views, 1)
@@ -3,7 +3,7 @@ import tempfile
 
 from django import forms
 from django.conf import settings
-from django.core.cache import cache
+from django.core.cache import cache, caches
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
@@ -226,6 +226,7 @@ class FollowTest(TestCase):
         )
 
     def setUp(self):
+        caches['shared'].clear()
         self.author_client = Client()
         self.author_client.force_login(self.author_user)
 
@@ -7,13 +7,18 @@ app_name = 'posts'
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('tags/<str:name>/', views.tag_posts, name='tag_posts'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
+    path('posts/<int:post_id>/comments/<int:comment_id>/',
+         views.comment_thread, name='comment_thread'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('new-posts/', views.new_posts_count, name='new_posts'),
+    path('notifications/', views.notification_inbox, name='notifications'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -24,5 +29,7 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
-
+    path('sitemap.xml', views.sitemap_index, name='sitemap'),
+    path('sitemap-<slug:section>-<int:chunk>.xml', views.sitemap_chunk,
+         name='sitemap_chunk'),
 ]
@@ -0,0 +1,108 @@
+from django.core.cache import caches
+from django.core.paginator import Page, Paginator
+from django.utils.functional import cached_property
+
+QUANTITY: int = 10
+PAGES_ON_EACH_SIDE: int = 2
+PAGES_ON_ENDS: int = 1
+COUNT_TIMEOUT: int = 5 * 60
+ELLIPSIS: str = '…'
+
+INDEX_COUNT_KEY: str = 'post_count:index'
+GROUP_COUNT_KEY: str = 'post_count:group:{}'
+AUTHOR_COUNT_KEY: str = 'post_count:author:{}'
+TAG_COUNT_KEY: str = 'post_count:tag:{}'
+
+
+def _counts():
+    """Счётчики лент лежат в общем для воркеров кеше: их сбрасывает
+    процесс, изменивший посты, а читают все."""
+    return caches['shared']
+
+
+class WindowedPage(Page):
+    ELLIPSIS = ELLIPSIS
+
+    def elided_page_range(self, on_each_side=PAGES_ON_EACH_SIDE,
+                          on_ends=PAGES_ON_ENDS):
+        """Номера страниц вокруг текущей, первые и последние,
+        а вместо пропущенных — ELLIPSIS."""
+        num_pages = self.paginator.num_pages
+        number = self.number
+        if num_pages <= (on_each_side + on_ends) * 2 + 1:
+            yield from range(1, num_pages + 1)
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield ELLIPSIS
+            yield from range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, который берёт общее число объектов из кеша.
+
+    Без count_key ведёт себя как обычный Paginator."""
+
+    def __init__(self, object_list, per_page, count_key=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        count = _counts().get(self.count_key)
+        if count is None:
+            count = super().count
+            _counts().set(self.count_key, count, COUNT_TIMEOUT)
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+def get_page(request, queryset, count_key=None):
+    paginator = CachedCountPaginator(queryset, QUANTITY, count_key=count_key)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def post_changed(sender, instance, **kwargs):
+    """Сбрасывает счётчики постов затронутых лент.
+
+    Если пост перенесли в другую группу, счётчик старой группы
+    устаревает не дольше чем на COUNT_TIMEOUT."""
+    keys = [INDEX_COUNT_KEY, AUTHOR_COUNT_KEY.format(instance.author_id)]
+    if instance.group_id is not None:
+        keys.append(GROUP_COUNT_KEY.format(instance.group_id))
+    _counts().delete_many(keys)
+
+
+def post_deleting(sender, instance, **kwargs):
+    """Сбрасывает счётчики тегов удаляемого поста, пока его записи
+    в индексе тегов ещё не удалены каскадом."""
+    invalidate_tag_counts(instance.post_tags.values_list(
+        'tag__name', flat=True))
+
+
+def invalidate_counts(keys):
+    _counts().delete_many(keys)
+
+
+def invalidate_tag_counts(names):
+    invalidate_counts([TAG_COUNT_KEY.format(name) for name in names])
+
+
+def prime_counts():
+    """Заполняет счётчик главной ленты при прогреве воркера."""
+    from .models import Post
+    return CachedCountPaginator(
+        Post.objects.filter(author__is_active=True), QUANTITY,
+        count_key=INDEX_COUNT_KEY).count
@@ -0,0 +1,167 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Case, F, PositiveIntegerField, Sum, Value, When
+
+from core import jobs, shared_store
+
+from .models import Post
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS post_view_buffer ('
+    'post_id INTEGER PRIMARY KEY, author_id INTEGER NOT NULL, '
+    'views INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS post_view_buffer_author '
+    'ON post_view_buffer (author_id)',
+)
+BATCH_SIZE: int = 500
+
+# Просмотры копятся в памяти процесса, раз в VIEW_COUNTS_PUSH_INTERVAL
+# секунд переносятся в общий буфер (SQLite-файл core.shared_store,
+# переживает перезапуск) и раз в VIEW_COUNTS_FLUSH_INTERVAL секунд
+# пачками записываются в Post.views.
+#
+# Потери при аварии ограничены:
+# * падение воркера теряет его несброшенные просмотры — не больше, чем
+#   он насчитал за VIEW_COUNTS_PUSH_INTERVAL секунд;
+# * падение процесса во время flush между выборкой буфера и записью
+#   в базу теряет одну выбранную пачку — не больше, чем все воркеры
+#   насчитали за VIEW_COUNTS_FLUSH_INTERVAL секунд.
+# Ошибка UPDATE (например, database is locked) просмотров не теряет:
+# незаписанные строки возвращаются в буфер до следующего flush.
+# Двойного учёта нет: пачка забирается из буфера атомарно.
+#
+# flush выполняется в фоне через core.jobs, а не в запросе просмотра.
+
+_lock = threading.Lock()
+_pending = {}
+_last_push = time.monotonic()
+_last_flush = time.monotonic()
+
+
+def _buffer():
+    return shared_store.ensure_schema('view_counts', SCHEMA)
+
+
+def record(post):
+    """Засчитывает просмотр поста без записи в основную базу."""
+    with _lock:
+        entry = _pending.setdefault(post.pk, [post.author_id, 0])
+        entry[1] += 1
+    push()
+    _schedule_flush()
+
+
+def push(force=False):
+    """Переносит просмотры процесса в общий буфер."""
+    global _last_push
+    now = time.monotonic()
+    if not force and now - _last_push < settings.VIEW_COUNTS_PUSH_INTERVAL:
+        return
+    with _lock:
+        rows = [(post_id, author_id, views)
+                for post_id, (author_id, views) in _pending.items()]
+        _pending.clear()
+        _last_push = now
+    if rows:
+        _store(rows)
+
+
+def _store(rows):
+    """Добавляет строки (post_id, author_id, views) в общий буфер."""
+    conn = _buffer()
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.executemany(
+            'INSERT INTO post_view_buffer (post_id, author_id, views) '
+            'VALUES (?, ?, ?) ON CONFLICT (post_id) '
+            'DO UPDATE SET views = views + excluded.views',
+            rows)
+
+
+def _claim():
+    """Забирает весь общий буфер одной транзакцией."""
+    conn = _buffer()
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        rows = conn.execute(
+            'SELECT post_id, author_id, views '
+            'FROM post_view_buffer').fetchall()
+        conn.execute('DELETE FROM post_view_buffer')
+    return rows
+
+
+def _schedule_flush():
+    """Ставит flush в фоновую очередь не чаще раза в
+    VIEW_COUNTS_FLUSH_INTERVAL секунд."""
+    global _last_flush
+    now = time.monotonic()
+    if now - _last_flush < settings.VIEW_COUNTS_FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    jobs.enqueue(flush)
+
+
+def flush():
+    """Записывает общий буфер в Post.views пачками UPDATE ... CASE.
+
+    Если UPDATE не удался, ещё не записанные строки возвращаются в
+    буфер, а ошибка пробрасывается дальше. Возвращает число обновлённых
+    постов."""
+    push(force=True)
+    rows = _claim()
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        try:
+            Post.objects.filter(
+                pk__in=[post_id for post_id, _, _ in batch],
+            ).update(views=F('views') + Case(
+                *[When(pk=post_id, then=Value(views))
+                  for post_id, _, views in batch],
+                default=Value(0),
+                output_field=PositiveIntegerField(),
+            ))
+        except Exception:
+            _store(rows[start:])
+            raise
+    return len(rows)
+
+
+def _pending_for_post(post_id):
+    with _lock:
+        entry = _pending.get(post_id)
+        return entry[1] if entry else 0
+
+
+def _pending_for_author(author_id):
+    with _lock:
+        return sum(views for entry_author_id, views in _pending.values()
+                   if entry_author_id == author_id)
+
+
+# flush записывает буфер только в основную базу, поэтому записанные
+# просмотры читаются оттуда же: с отставшей реплики сумма уменьшилась
+# бы до следующей sync_replica.
+def _stored(**filters):
+    return Post.objects.using(DEFAULT_DB_ALIAS).filter(**filters).aggregate(
+        total=Sum('views'))['total'] or 0
+
+
+def post_views(post):
+    """Просмотры поста с учётом ещё не записанных в базу."""
+    row = _buffer().execute(
+        'SELECT views FROM post_view_buffer WHERE post_id = ?',
+        (post.pk,)).fetchone()
+    return (_stored(pk=post.pk) + (row[0] if row else 0)
+            + _pending_for_post(post.pk))
+
+
+def author_views(author):
+    """Суммарные просмотры постов автора."""
+    stored = _stored(author_id=author.pk)
+    buffered = _buffer().execute(
+        'SELECT COALESCE(SUM(views), 0) FROM post_view_buffer '
+        'WHERE author_id = ?', (author.pk,)).fetchone()[0]
+    return stored + buffered + _pending_for_author(author.pk)
@@ -1,20 +1,32 @@
 from datetime import datetime
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import (FileResponse, Http404, HttpResponseBadRequest,
+                         HttpResponseForbidden, HttpResponseNotModified,
+                         JsonResponse, StreamingHttpResponse)
 from django.shortcuts import render, get_object_or_404, redirect
 
+from core import jobs
+
+from . import (comment_threads, follow_graph, groups, new_posts,
+               notifications, recommendations, sitemaps, view_counts)
 from .forms import PostForm, CommentForm
-from .models import Post, Group, User, Follow
+from .models import Comment, Post, Tag, User
+from .utils import (AUTHOR_COUNT_KEY, GROUP_COUNT_KEY, INDEX_COUNT_KEY,
+                    TAG_COUNT_KEY, get_page)
+
 
-QUANTITY: int = 10
+# Поля, которые записывает правка поста: поля формы, HTML,
+# пересчитанный в Post.save, и время правки.
+POST_EDIT_FIELDS = (*PostForm._meta.fields, 'text_html', 'excerpt_html',
+                    'updated')
 
 
 def index(request):
-    post_list = Post.objects.select_related('author').all()
-    paginator = Paginator(post_list, QUANTITY)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.select_related('author').filter(
+        author__is_active=True)
+    page_obj = get_page(request, post_list, INDEX_COUNT_KEY)
     context = {
         'page_obj': page_obj,
     }
@@ -22,11 +34,10 @@ def index(request):
 
 
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('group').all()
-    paginator = Paginator(posts, QUANTITY)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = groups.get_or_404(slug)
+    posts = group.posts.select_related('author').filter(
+        author__is_active=True)
+    page_obj = get_page(request, posts, GROUP_COUNT_KEY.format(group.id))
     context = {
         'group': group,
         'posts': posts,
@@ -35,44 +46,73 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    posts = Post.objects.select_related('author').filter(
+        post_tags__tag=tag, author__is_active=True,
+    ).order_by('-post_tags__pub_date')
+    page_obj = get_page(request, posts, TAG_COUNT_KEY.format(tag.name))
+    context = {
+        'tag': tag,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/tag_list.html', context)
+
+
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(User, username=username, is_active=True)
     post_list = author.posts.select_related('author').all()
-    quantity = post_list.count()
-    paginator = Paginator(post_list, QUANTITY)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    following = 0
-    if request.user.is_authenticated:
-        following = author.following.filter(user=request.user).exists()
+    page_obj = get_page(request, post_list,
+                        AUTHOR_COUNT_KEY.format(author.id))
+    quantity = page_obj.paginator.count
+    following = follow_graph.is_following(request.user.id, author.id)
     context = {
         'author': author,
         'posts': post_list,
         'quantity': quantity,
         'page_obj': page_obj,
-        'following': following
+        'following': following,
+        'follow_counts': follow_graph.follow_counts(author.id),
+        'views': view_counts.author_views(author),
+        'suggestions': recommendations.suggestions_for(request.user),
     }
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post, pk=post_id, author__is_active=True)
+    groups.registry.attach([post])
     author = get_object_or_404(User, username=post.author.username)
     post_list = author.posts.select_related('author').all()
-    comments = post.comments.select_related('author').all()
+    comments = comment_threads.threads_for(post)
     form = CommentForm()
+    view_counts.record(post)
 
     quantity = post_list.count()
 
     context = {
         'quantity': quantity,
         'post': post,
+        'views': view_counts.post_views(post),
         'comments': comments,
         'form': form,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def comment_thread(request, post_id, comment_id):
+    root = get_object_or_404(
+        Comment, pk=comment_id, post_id=post_id,
+        post__author__is_active=True, author__is_active=True)
+    context = {
+        'post': root.post,
+        'root': root,
+        'comments': comment_threads.thread(root),
+        'form': CommentForm(),
+    }
+    return render(request, 'posts/comment_thread.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -81,6 +121,7 @@ def post_create(request):
         post.author = request.user
         post.pub_date = datetime.now()
         post.save()
+        jobs.enqueue(notifications.notify_followers, post.id)
         return redirect('posts:profile', username=request.user)
     return render(request, 'posts/create_post.html', {'form': form})
 
@@ -96,7 +137,10 @@ def post_edit(request, post_id):
         files=request.FILES or None,
         instance=post)
     if form.is_valid():
-        post.save()
+        post = form.save(commit=False)
+        # views меняет только posts.view_counts.flush: правка не должна
+        # затирать его значением, прочитанным до неё.
+        post.save(update_fields=POST_EDIT_FIELDS)
         return redirect('posts:post_detail', post_id)
 
     context = {
@@ -108,13 +152,17 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post, pk=post_id, author__is_active=True)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
+        parent_id = request.POST.get('parent')
+        if parent_id and parent_id.isdigit():
+            comment.parent = post.comments.filter(pk=parent_id).first()
         comment.save()
+        jobs.enqueue(notifications.notify_comment, comment.id)
     return redirect('posts:post_detail', post_id=post_id)
 
 
@@ -122,31 +170,103 @@ def add_comment(request, post_id):
 def follow_index(request):
     authors = request.user.follower.values_list('author', flat=True)
 
-    post_list = Post.objects.filter(author__id__in=authors)
-    paginator = Paginator(post_list, QUANTITY)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.select_related('author').filter(
+        author__id__in=authors, author__is_active=True)
+    page_obj = get_page(request, post_list)
     context = {
         'page_obj': page_obj,
+        'suggestions': recommendations.suggestions_for(request.user),
     }
     return render(request, 'posts/follow.html', context)
 
 
+@login_required
+def notification_inbox(request):
+    before = request.GET.get('before')
+    page, next_before = notifications.inbox_page(
+        request.user, int(before) if before and before.isdigit() else None)
+    context = {
+        'notifications': page,
+        'next_before': next_before,
+    }
+    response = render(request, 'posts/notifications.html', context)
+    notifications.mark_read(request.user, page)
+    return response
+
+
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(User, username=username, is_active=True)
     if request.user != author:
-        Follow.objects.create(
-            user=request.user,
-            author=author
-        )
+        follow_graph.follow(request.user, author)
     return redirect('posts:profile', username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    Follow.objects.filter(
-        user=request.user,
-        author__username=username
-    ).delete()
+    author = get_object_or_404(User, username=username)
+    follow_graph.unfollow(request.user, author)
     return redirect('posts:profile', username)
+
+
+def sitemap_index(request):
+    base_url = request.build_absolute_uri('/')[:-1]
+    return StreamingHttpResponse(sitemaps.index(base_url),
+                                 content_type='application/xml')
+
+
+def sitemap_chunk(request, section, chunk):
+    if section not in sitemaps.SECTIONS:
+        raise Http404
+    base_url = request.build_absolute_uri('/')[:-1]
+    path = sitemaps.cached_path(section, chunk, base_url)
+    if sitemaps.is_fresh(path):
+        return FileResponse(open(path, 'rb'), content_type='application/xml')
+    return StreamingHttpResponse(
+        sitemaps.render_and_store(section, chunk, base_url, path),
+        content_type='application/xml')
+
+
+def new_posts_count(request):
+    """Сколько в ленте постов новее курсора since.
+
+    По умолчанию отвечает сразу, а 304 по ETag — пока отметка ленты не
+    изменилась. С wait держит запрос до NEW_POSTS_MAX_WAIT секунд в
+    ожидании новых постов, если в процессе есть свободное место
+    из NEW_POSTS_MAX_WAITERS."""
+    scope_name = request.GET.get('scope', 'index')
+    since = request.GET.get('since', '')
+    wait = request.GET.get('wait', '0')
+    if not (since.isdigit() and wait.isdigit()):
+        return HttpResponseBadRequest()
+    since = int(since)
+    if scope_name == 'index':
+        scope = new_posts.index_scope()
+    elif scope_name == 'group':
+        scope = new_posts.group_scope(
+            groups.get_or_404(request.GET.get('slug')))
+    elif scope_name == 'follow':
+        if not request.user.is_authenticated:
+            return HttpResponseForbidden()
+        scope = new_posts.follow_scope(request.user)
+    else:
+        return HttpResponseBadRequest()
+
+    timeout = min(int(wait), settings.NEW_POSTS_MAX_WAIT)
+    if timeout:
+        high_water_mark = new_posts.wait_for_posts(scope, since, timeout)
+    else:
+        high_water_mark = scope.high_water_mark()
+    etag = f'"{scope.name}:{since}:{high_water_mark}"'
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        response = HttpResponseNotModified()
+    else:
+        count = scope.count_since(since, high_water_mark)
+        response = JsonResponse({
+            'count': count,
+            'capped': count >= new_posts.MAX_COUNT,
+            'cursor': max(since, high_water_mark),
+        })
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
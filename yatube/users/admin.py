@@ -1 +1,33 @@
-# Register your models here.
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+
+from posts import purge
+
+User = get_user_model()
+
+
+class SoftDeleteUserAdmin(UserAdmin):
+    """Удаление из админки только деактивирует пользователя и ставит его
+    в очередь purge_users: каскадное удаление всего контента в одном
+    запросе надолго блокирует базу."""
+
+    def get_deleted_objects(self, objs, request):
+        # Не собираем связанные объекты: их может быть очень много.
+        to_delete = [str(obj) for obj in objs]
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.opts.verbose_name)
+        return (to_delete, {self.opts.verbose_name_plural: len(to_delete)},
+                perms_needed, [])
+
+    def delete_model(self, request, obj):
+        purge.soft_delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            purge.soft_delete(user)
+
+
+admin.site.unregister(User)
+admin.site.register(User, SoftDeleteUserAdmin)
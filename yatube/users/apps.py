@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
 
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        from core import warmup
+
+        from .autocomplete import prime, user_created
+        post_save.connect(user_created, sender=get_user_model(),
+                          dispatch_uid='users_autocomplete_user_created')
+        warmup.register('autocomplete', prime)
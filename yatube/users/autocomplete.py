@@ -0,0 +1,162 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from core import jobs
+
+SUGGESTIONS_COUNT: int = 10
+# Разделитель ключа и id: меньше любого печатного символа, поэтому
+# записи с одинаковым ключом сортируются вплотную к нему.
+SEPARATOR: str = '\x00'
+
+
+def _keys(username, first_name, last_name):
+    """Строки, по началу которых находится пользователь."""
+    keys = {username.lower()}
+    full_name = f'{first_name} {last_name}'.strip().lower()
+    if full_name:
+        keys.add(full_name)
+    if last_name:
+        keys.add(last_name.lower())
+    return keys
+
+
+class UsernameIndex:
+    """Отсортированный в памяти снимок ключей пользователей.
+
+    Каждая запись — строка 'ключ\\x00id', поиск по префиксу — bisect
+    и просмотр соседних записей. Новые пользователи добавляются по
+    сигналу в своём процессе и догружаются по id > last_id в остальных;
+    переименования подхватывает полная пересборка раз в
+    AUTOCOMPLETE_REBUILD_INTERVAL секунд. Пересборку выполняет один
+    поток, а запросы до её окончания ищут по старому снимку."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._building = False
+        self._entries = None
+        self._last_id = 0
+        self._built = 0.0
+        self._checked = 0.0
+
+    def _rows(self, queryset):
+        return queryset.order_by('id').values_list(
+            'id', 'username', 'first_name', 'last_name').iterator()
+
+    def _build(self):
+        users = get_user_model().objects.filter(is_active=True)
+        entries = []
+        last_id = 0
+        for user_id, *names in self._rows(users):
+            entries += [f'{key}{SEPARATOR}{user_id}' for key in _keys(*names)]
+            last_id = user_id
+        entries.sort()
+        with self._lock:
+            self._entries = entries
+            self._last_id = last_id
+            self._built = self._checked = time.monotonic()
+
+    def rebuild(self):
+        with self._build_lock:
+            self._build()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        finally:
+            self._building = False
+
+    def _schedule_rebuild(self):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        jobs.enqueue(self._rebuild_in_background)
+
+    def add(self, user_id, username, first_name='', last_name=''):
+        with self._lock:
+            if self._entries is None:
+                return
+            for key in _keys(username, first_name, last_name):
+                insort(self._entries, f'{key}{SEPARATOR}{user_id}')
+            self._last_id = max(self._last_id, user_id)
+
+    def refresh(self):
+        """Собирает снимок при первом обращении, затем догружает новых
+        пользователей не чаще раза в AUTOCOMPLETE_REFRESH_INTERVAL.
+
+        Первую сборку ждут все потоки, а выполняет один из них;
+        устаревший снимок пересобирается в фоне."""
+        if self._entries is None:
+            with self._build_lock:
+                if self._entries is None:
+                    self._build()
+            return
+        now = time.monotonic()
+        if now - self._built > settings.AUTOCOMPLETE_REBUILD_INTERVAL:
+            self._schedule_rebuild()
+        if now - self._checked < settings.AUTOCOMPLETE_REFRESH_INTERVAL:
+            return
+        self._checked = now
+        new_users = get_user_model().objects.filter(
+            is_active=True, id__gt=self._last_id)
+        for user_id, *names in self._rows(new_users):
+            self.add(user_id, *names)
+
+    def search(self, prefix, limit=SUGGESTIONS_COUNT):
+        """id пользователей, у которых ключ начинается с prefix,
+        в алфавитном порядке ключей."""
+        prefix = prefix.lower()
+        entries = self._entries
+        found = []
+        index = bisect_left(entries, prefix)
+        while index < len(entries) and len(found) < limit:
+            key, _, user_id = entries[index].rpartition(SEPARATOR)
+            if not key.startswith(prefix):
+                break
+            if int(user_id) not in found:
+                found.append(int(user_id))
+            index += 1
+        return found
+
+
+index = UsernameIndex()
+
+
+def prime():
+    """Собирает снимок при прогреве воркера."""
+    index.rebuild()
+    return len(index._entries)
+
+
+def suggest(prefix, limit=SUGGESTIONS_COUNT):
+    """Активные пользователи, чьё имя или фамилия начинается с prefix.
+
+    Снимок может отставать от базы, поэтому найденные записи
+    перепроверяются по свежим данным одним запросом по первичному
+    ключу."""
+    prefix = prefix.strip()
+    if not prefix:
+        return []
+    index.refresh()
+    user_ids = index.search(prefix, limit * 2)
+    users = get_user_model().objects.in_bulk(user_ids)
+    matched = []
+    for user_id in user_ids:
+        user = users.get(user_id)
+        if user is None or not user.is_active:
+            continue
+        keys = _keys(user.username, user.first_name, user.last_name)
+        if any(key.startswith(prefix.lower()) for key in keys):
+            matched.append(user)
+    return matched[:limit]
+
+
+def user_created(sender, instance, created, **kwargs):
+    if created:
+        index.add(instance.pk, instance.username,
+                  instance.first_name, instance.last_name)
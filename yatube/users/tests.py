@@ -1 +1,74 @@
-# Create your tests here.
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import User
+
+from . import autocomplete
+
+
+class UserAutocompleteTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.anna = User.objects.create_user(
+            username='anna', first_name='Анна', last_name='Каренина')
+        cls.andrey = User.objects.create_user(
+            username='andrey', first_name='Андрей', last_name='Болконский')
+        User.objects.create_user(username='boris')
+
+    def setUp(self):
+        autocomplete.index.rebuild()
+        self.guest_client = Client()
+
+    def test_prefix_matches_username_and_names(self):
+        """Префикс ищется по логину, имени и фамилии без учёта регистра"""
+        self.assertEqual(autocomplete.suggest('AN'), [self.andrey, self.anna])
+        self.assertEqual(autocomplete.suggest('болк'), [self.andrey])
+        self.assertEqual(autocomplete.suggest('анна к'), [self.anna])
+        self.assertEqual(autocomplete.suggest(''), [])
+
+    def test_new_user_is_added_incrementally(self):
+        """Новый пользователь находится без пересборки снимка"""
+        user = User.objects.create_user(username='anton')
+        self.assertIn(user, autocomplete.suggest('ant'))
+
+    def test_inactive_and_renamed_users_are_filtered(self):
+        User.objects.filter(pk=self.anna.pk).update(is_active=False)
+        User.objects.filter(pk=self.andrey.pk).update(username='zed',
+                                                      first_name='')
+        self.assertEqual(autocomplete.suggest('an'), [])
+
+    def test_stale_index_is_rebuilt_once_in_background(self):
+        """Пока идёт пересборка, поиск идёт по старому снимку, а вторая
+        пересборка не запускается"""
+        index = autocomplete.index
+        index._built = (time.monotonic()
+                        - settings.AUTOCOMPLETE_REBUILD_INTERVAL - 1)
+        with mock.patch('core.jobs.enqueue') as enqueue:
+            self.assertEqual(autocomplete.suggest('bor')[0].username,
+                             'boris')
+            autocomplete.suggest('bor')
+        enqueue.assert_called_once_with(index._rebuild_in_background)
+        self.assertTrue(index._building)
+        index._rebuild_in_background()
+        self.assertFalse(index._building)
+
+    def test_rebuild_picks_up_renames(self):
+        User.objects.filter(pk=self.andrey.pk).update(last_name='Ростов')
+        autocomplete.index._built = (
+            time.monotonic() - settings.AUTOCOMPLETE_REBUILD_INTERVAL - 1)
+        autocomplete.suggest('x')
+        self.assertEqual(autocomplete.suggest('рост'), [self.andrey])
+
+    def test_endpoint(self):
+        response = self.guest_client.get(reverse('users:autocomplete'),
+                                         {'q': 'bor'})
+        self.assertEqual(response.json(), {'results': [{
+            'username': 'boris',
+            'full_name': '',
+            'url': reverse('posts:profile', args=('boris',)),
+        }]})
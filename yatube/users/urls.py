@@ -16,5 +16,6 @@ urlpatterns = [
          name='login'
          ),
     path('password_reset/', PasswordResetView.as_view(),
-         name='password_reset')
+         name='password_reset'),
+    path('autocomplete/', views.user_autocomplete, name='autocomplete'),
 ]
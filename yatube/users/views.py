@@ -1,10 +1,29 @@
-from django.urls import reverse_lazy
+from django.http import JsonResponse
+from django.urls import reverse, reverse_lazy
+from django.views.decorators.cache import cache_control
 from django.views.generic import CreateView
 
+from . import autocomplete
 from .forms import CreationForm
 
+PREFIX_MAX_LEN: int = 150
+
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+
+@cache_control(max_age=60)
+def user_autocomplete(request):
+    prefix = request.GET.get('q', '')[:PREFIX_MAX_LEN]
+    users = autocomplete.suggest(prefix)
+    return JsonResponse({'results': [
+        {
+            'username': user.username,
+            'full_name': user.get_full_name(),
+            'url': reverse('posts:profile', args=(user.username,)),
+        }
+        for user in users
+    ]})
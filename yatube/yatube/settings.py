@@ -51,20 +51,25 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.timing.ServerTimingMiddleware',
+    'core.middleware.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.middleware.ratelimit.RateLimitMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.auth.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.db_routing.ReplicaRoutingMiddleware',
+    'core.middleware.profiling.StaffProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backend.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -74,6 +79,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.notifications.unread_notifications',
             ],
         },
     },
@@ -84,11 +90,50 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+REPLICA_DATABASE_PATH = os.path.join(BASE_DIR, 'db_replica.sqlite3')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{REPLICA_DATABASE_PATH}?mode=ro',
+        'OPTIONS': {'uri': True},
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+
+# Реплика обновляется командой sync_replica (core).
+REPLICA_DATABASE = 'replica'
+REPLICA_APPS = ('posts', 'auth')
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:follow_index',
+)
+REPLICA_PIN_VIEWS = (
+    'posts:post_create',
+    'posts:post_edit',
+    'posts:add_comment',
+    'posts:profile_follow',
+    'posts:profile_unfollow',
+)
+
+# Применяются к каждому новому SQLite-соединению (core.db).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
 }
 
 # Password validation
@@ -132,6 +177,13 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# Без DEBUG collectstatic добавляет хеш в имена файлов и сжимает их,
+# а yatube/wsgi.py отдаёт результат с immutable-кешированием.
+if not DEBUG:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
@@ -139,8 +191,98 @@ LOGIN_REDIRECT_URL = 'posts:index'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+# Сессии и всё, что проверяет доступ, должны быть видны всем воркерам:
+# выход или деактивация на одном воркере сразу действуют на всех.
+SESSION_CACHE_ALIAS = 'shared'
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
-}
\ No newline at end of file
+        'BACKEND': 'core.cache.InstrumentedLocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'core.cache.SharedStoreCache',
+    },
+}
+
+# Общая для всех воркеров SQLite-база служебных данных (core.shared_store).
+SHARED_STATE_PATH = os.path.join(BASE_DIR, 'shared_state.sqlite3')
+
+TEST_RUNNER = 'core.test_runner.IsolatedStateRunner'
+
+# Выполнять задачи core.jobs сразу, а не в фоновом потоке.
+JOBS_EAGER = False
+
+METRICS_FLUSH_INTERVAL = 5
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+# Если задан, /metrics отдаётся и по заголовку Authorization: Bearer <токен>.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Адреса обратных прокси. За ними адрес клиента берётся из
+# X-Forwarded-For (core.http.client_ip), поэтому прокси обязан
+# дописывать в этот заголовок адрес клиента.
+TRUSTED_PROXIES = ('127.0.0.1', '::1')
+
+# Ограничение частоты по имени URL: методы, скорость пополнения
+# корзины ('число/s|m|h|d') и её ёмкость.
+RATELIMITS = {
+    'posts:post_create': {'methods': ('POST',), 'rate': '30/h', 'burst': 10},
+    'posts:add_comment': {'methods': ('POST',), 'rate': '120/h', 'burst': 20},
+    'posts:profile_follow': {'methods': ('GET',), 'rate': '120/h',
+                             'burst': 30},
+    'posts:profile_unfollow': {'methods': ('GET',), 'rate': '120/h',
+                               'burst': 30},
+    'users:signup': {'methods': ('POST',), 'rate': '10/h', 'burst': 5},
+    'posts:new_posts': {'methods': ('GET',), 'rate': '720/h', 'burst': 30},
+}
+
+# Просмотры постов: перенос из процесса в общий буфер и из буфера
+# в базу, в секундах. Оценка потерь при аварии — в posts/view_counts.py.
+VIEW_COUNTS_PUSH_INTERVAL = 1
+VIEW_COUNTS_FLUSH_INTERVAL = 30
+
+# Снимок для автодополнения имён: догрузка новых пользователей
+# и полная пересборка, в секундах.
+AUTOCOMPLETE_REFRESH_INTERVAL = 5
+AUTOCOMPLETE_REBUILD_INTERVAL = 60 * 60
+
+# Наибольшее время ожидания новых постов в long-poll, в секундах.
+NEW_POSTS_MAX_WAIT = 25
+# Сколько запросов процесса могут ждать одновременно; остальным
+# отвечают сразу, как при wait=0.
+NEW_POSTS_MAX_WAITERS = 4
+
+# Собранные куски sitemap; файл куска пересобирается при изменении
+# его диапазона id или по истечении SITEMAP_MAX_AGE секунд.
+SITEMAP_CACHE_DIR = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAP_MAX_AGE = 24 * 60 * 60
+
+PROFILER_OUTPUT_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILER_SAMPLE_INTERVAL = 0.005
+PROFILER_USER_COOLDOWN = 60
+PROFILER_GLOBAL_COOLDOWN = 5
+
+# Прогрев воркера при загрузке yatube/wsgi.py: шаблоны, URL, переводы,
+# sorl-thumbnail и горячие ключи кеша. Отчёт о длительности шагов
+# дописывается строкой JSON в WARMUP_REPORT_PATH.
+WARMUP_ON_START = not DEBUG
+WARMUP_REPORT_PATH = os.path.join(BASE_DIR, 'logs', 'warmup.jsonl')
+
+THUMBNAIL_BACKEND = 'core.thumbnail.TimedThumbnailBackend'
+
+# Строки Server-Timing пишутся в лог только без DEBUG.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['console'],
+            'level': 'WARNING' if DEBUG else 'INFO',
+        },
+    },
+}
@@ -8,9 +8,22 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 """
 
 import os
+import time
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
+started = time.perf_counter()
 application = get_wsgi_application()
+
+if settings.WARMUP_ON_START:
+    from core import warmup
+
+    warmup.run({'django_setup': time.perf_counter() - started})
+
+if not settings.DEBUG:
+    from core.wsgi_static import StaticFilesApplication
+
+    application = StaticFilesApplication(application)